@@ -1,22 +1,66 @@
+import math
+import time
+from typing import Any, Dict, List, Optional
+
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse, Response
 
+from app import metrics
 from app.config import settings
+from app.executor import run_blocking
+from app.fuzzy import MATCH_MODES
 from app.logging_setup import get_logger
 from app.models import ApiRequest
-from app.search import get_trip, search_by_surname
+from app.pagination import CursorExpiredError, InvalidQueryError
+from app.responses import FastJSONResponse, ndjson_response, wants_ndjson
+from app.search import (
+    get_trip,
+    get_trip_batch,
+    iter_get_trip_batch,
+    iter_search_batch,
+    search_batch,
+    search_by_surname,
+)
 from app.security import check_api_key, is_allowed_user, rate_limiter
+from app.serialization import dumps
 
 router = APIRouter()
 
+API_ACTIONS = ("search", "get_trip", "search_batch", "get_trip_batch")
+API_LATENCY = metrics.histogram(
+    "crm_api_request_duration_seconds",
+    "POST /api latency by action and HTTP status.",
+    ("action", "status"),
+)
+
 
 @router.get("/health")
 async def healthcheck():
     return {"status": "ok"}
 
 
+@router.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @router.post("/api")
 async def handle_api(request: Request, payload: ApiRequest):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await _handle_api(request, payload)
+        status = response.status_code
+        return response
+    except HTTPException as exc:
+        status = exc.status_code
+        raise
+    finally:
+        action = payload.action if payload.action in API_ACTIONS else "unknown"
+        API_LATENCY.observe(time.perf_counter() - started, action=action, status=str(status))
+
+
+async def _handle_api(request: Request, payload: ApiRequest):
     logger = get_logger("api")
     header_key = request.headers.get(settings.x_api_key_header_name)
     api_key = payload.api_key or header_key
@@ -27,31 +71,68 @@ async def handle_api(request: Request, payload: ApiRequest):
     if not is_allowed_user(user_id):
         raise HTTPException(status_code=403, detail="Forbidden")
 
+    action = payload.action
+    batch_keys = _batch_keys(payload)
+    if batch_keys is not None and len(batch_keys) > _max_batch_keys():
+        raise HTTPException(status_code=400, detail=f"batch too large, at most {_max_batch_keys()} keys")
+
     rate_key = f"api:{api_key}"
-    if not rate_limiter.allow(rate_key):
+    if not rate_limiter.allow(rate_key, _rate_cost(batch_keys)):
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
-    action = payload.action
+    stream = batch_keys is not None and wants_ndjson(request.headers.get("accept", ""))
     try:
         if action == "search":
             surname = payload.surname or payload.lastName or payload.lastname
             if not surname:
                 raise HTTPException(status_code=400, detail="surname missing")
-            result = search_by_surname(surname)
+            mode = payload.mode or "exact"
+            if mode not in MATCH_MODES:
+                raise HTTPException(status_code=400, detail="unknown mode")
+            if payload.limit is not None and payload.limit < 1:
+                raise HTTPException(status_code=400, detail="invalid limit")
+            result = await run_blocking(search_by_surname, surname, mode, payload.cursor, payload.limit)
             logger.info(
                 "action=search status=ok count=%s",
                 result.get("count", 0),
             )
-            return JSONResponse(result)
+            return FastJSONResponse(result)
         if action == "get_trip":
             trip_id = payload.trip_id or payload.tripId or payload.trip
             if not trip_id:
                 raise HTTPException(status_code=400, detail="trip_id missing")
-            result = get_trip(trip_id)
+            result = await run_blocking(get_trip, trip_id)
             logger.info("action=get_trip status=ok")
-            return JSONResponse(result)
+            return FastJSONResponse(result)
+        if action == "search_batch":
+            if not batch_keys:
+                raise HTTPException(status_code=400, detail="surnames missing")
+            mode = payload.mode or "exact"
+            if mode not in MATCH_MODES:
+                raise HTTPException(status_code=400, detail="unknown mode")
+            if stream:
+                items = await run_blocking(iter_search_batch, batch_keys, mode)
+                logger.info("action=search_batch status=streaming count=%s", len(batch_keys))
+                return ndjson_response(items)
+            result = await run_blocking(search_batch, batch_keys, mode)
+            logger.info("action=search_batch status=ok count=%s", result["count"])
+            return await _batch_response(result)
+        if action == "get_trip_batch":
+            if not batch_keys:
+                raise HTTPException(status_code=400, detail="trip_ids missing")
+            if stream:
+                items = await run_blocking(iter_get_trip_batch, batch_keys)
+                logger.info("action=get_trip_batch status=streaming count=%s", len(batch_keys))
+                return ndjson_response(items)
+            result = await run_blocking(get_trip_batch, batch_keys)
+            logger.info("action=get_trip_batch status=ok count=%s", result["count"])
+            return await _batch_response(result)
     except LookupError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except CursorExpiredError as exc:
+        raise HTTPException(status_code=410, detail=str(exc)) from exc
+    except InvalidQueryError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except HTTPException:
         raise
     except Exception as exc:
@@ -59,3 +140,26 @@ async def handle_api(request: Request, payload: ApiRequest):
         raise HTTPException(status_code=500, detail="internal error") from exc
 
     raise HTTPException(status_code=400, detail="unknown action")
+
+
+async def _batch_response(result: Dict[str, Any]) -> Response:
+    return Response(await run_blocking(dumps, result), media_type="application/json")
+
+
+def _batch_keys(payload: ApiRequest) -> Optional[List[str]]:
+    if payload.action == "search_batch":
+        return payload.surnames or []
+    if payload.action == "get_trip_batch":
+        return payload.trip_ids or []
+    return None
+
+
+def _max_batch_keys() -> int:
+    # A batch costing more than the whole per-minute bucket could never pass the rate limiter.
+    return min(settings.max_batch_size, settings.rate_limit_per_min * max(settings.batch_items_per_token, 1))
+
+
+def _rate_cost(batch_keys: Optional[List[str]]) -> float:
+    if batch_keys is None:
+        return 1.0
+    return float(max(1, math.ceil(len(batch_keys) / max(settings.batch_items_per_token, 1))))
@@ -1,18 +1,54 @@
 import asyncio
-from aiogram import Bot, Dispatcher, Router
+import functools
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiogram import Bot, Dispatcher, F, Router
 from aiogram.filters import Command
-from aiogram.types import Message
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
+from app import metrics
 from app.config import settings
-from app.logging_setup import get_logger
-from app.search import get_trip, search_by_surname
+from app.executor import run_blocking
+from app.fuzzy import MATCH_MODES
+from app.logging_setup import get_logger, setup_logging
+from app.pagination import CursorExpiredError, InvalidQueryError
+from app.refresher import start_snapshot_watch_task
+from app.render import (
+    MORE_CALLBACK_PREFIX,
+    chunk_messages,
+    more_callback_data,
+    parse_more_callback,
+    render_page_footer,
+    render_trip,
+    send_chunks,
+)
+from app.search import get_trip, search_by_surname, uses_published_snapshot
 from app.security import is_allowed_user, rate_limiter
 
 router = Router()
 logger = get_logger("bot")
 
+BOT_LATENCY = metrics.histogram(
+    "crm_bot_handler_duration_seconds",
+    "Telegram command handler latency.",
+    ("command",),
+)
+
+
+def _timed(command: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    def decorator(handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(handler)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with BOT_LATENCY.time(command=command):
+                return await handler(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
 
 @router.message(Command("search"))
+@_timed("search")
 async def handle_search(message: Message) -> None:
     user_id = str(message.from_user.id) if message.from_user else ""
     if not is_allowed_user(user_id):
@@ -26,15 +62,63 @@ async def handle_search(message: Message) -> None:
     if len(args) < 2:
         await message.answer("Нужна фамилия для поиска")
         return
-    result = search_by_surname(args[1])
+    surname, mode = _split_search_mode(args[1])
+    result = await run_blocking(search_by_surname, surname, mode)
     if result.get("count", 0) == 0:
         await message.answer("Ничего не найдено")
         return
-    for text in result.get("textMessages", []):
-        await message.answer(text)
+    await _answer_search_page(message.bot, message.chat.id, surname, mode, result)
+
+
+@router.callback_query(F.data.startswith(MORE_CALLBACK_PREFIX))
+@_timed("more")
+async def handle_more(callback: CallbackQuery) -> None:
+    user_id = str(callback.from_user.id) if callback.from_user else ""
+    if not is_allowed_user(user_id):
+        await callback.answer("Доступ запрещен")
+        return
+    rate_key = f"tg:{user_id}"
+    if not rate_limiter.allow(rate_key):
+        await callback.answer("Слишком много запросов, попробуи позже")
+        return
+    try:
+        surname, mode, cursor = parse_more_callback(callback.data or "")
+    except ValueError:
+        await callback.answer("Некорректный запрос")
+        return
+    try:
+        result = await run_blocking(search_by_surname, surname, mode, cursor)
+    except CursorExpiredError:
+        await callback.answer("Данные обновились, повторите поиск через /search", show_alert=True)
+        return
+    except InvalidQueryError:
+        await callback.answer("Некорректный запрос")
+        return
+    await callback.answer()
+    await _answer_search_page(callback.bot, callback.message.chat.id, surname, mode, result)
+
+
+async def _answer_search_page(bot: Bot, chat_id: int, surname: str, mode: str, result: Dict[str, Any]) -> None:
+    texts = list(result.get("textMessages", []))
+    markup = None
+    next_cursor = result.get("next_cursor")
+    if next_cursor:
+        data = more_callback_data(surname, mode, next_cursor)
+        texts.append(render_page_footer(result, has_button=data is not None))
+        if data is not None:
+            markup = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="Следующие", callback_data=data)]])
+    await send_chunks(bot, chat_id, chunk_messages(texts), reply_markup=markup)
+
+
+def _split_search_mode(text: str) -> Tuple[str, str]:
+    parts = text.rsplit(maxsplit=1)
+    if len(parts) == 2 and parts[1].lower() in MATCH_MODES:
+        return parts[0], parts[1].lower()
+    return text, "exact"
 
 
 @router.message(Command("get_trip"))
+@_timed("get_trip")
 async def handle_get_trip(message: Message) -> None:
     user_id = str(message.from_user.id) if message.from_user else ""
     if not is_allowed_user(user_id):
@@ -49,11 +133,11 @@ async def handle_get_trip(message: Message) -> None:
         await message.answer("Нужен идентификатор поездки")
         return
     try:
-        result = get_trip(args[1])
+        result = await run_blocking(get_trip, args[1])
     except LookupError:
         await message.answer("Поездка не найдена")
         return
-    await message.answer(str(result))
+    await send_chunks(message.bot, message.chat.id, chunk_messages([render_trip(result)]))
 
 
 def create_bot() -> Bot:
@@ -82,3 +166,19 @@ def start_bot_task(loop: asyncio.AbstractEventLoop) -> asyncio.Task:
     bot = create_bot()
     dispatcher = create_dispatcher()
     return loop.create_task(start_polling(bot, dispatcher))
+
+
+async def run_bot_process() -> None:
+    watch_task = None
+    if uses_published_snapshot():
+        watch_task = start_snapshot_watch_task(asyncio.get_running_loop())
+    try:
+        await run_bot()
+    finally:
+        if watch_task:
+            watch_task.cancel()
+
+
+if __name__ == "__main__":
+    setup_logging(settings.log_level)
+    asyncio.run(run_bot_process())
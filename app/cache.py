@@ -1,30 +1,190 @@
+import sys
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 
 
 @dataclass
 class CacheEntry:
     value: Any
     expires_at: float
+    stale_until: float
+    size: int = 0
 
 
 class TTLCache:
-    def __init__(self, ttl_seconds: int) -> None:
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_stale_seconds: int = 0,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+        sweep_interval: float = 60.0,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
         self.ttl_seconds = ttl_seconds
-        self._store: Dict[str, CacheEntry] = {}
+        self.max_stale_seconds = max_stale_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._sizeof = sizeof or sys.getsizeof
+        self._store: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._next_sweep = time.time() + sweep_interval
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
 
     def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._get_entry(key)
+            if not entry or entry.expires_at < time.time():
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry.value
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        return self.lookup(key)[0]
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], str]:
+        with self._lock:
+            value, freshness = self._peek(key)
+            if freshness == "fresh":
+                self._hits += 1
+            elif freshness == "stale":
+                self._stale_hits += 1
+            else:
+                self._misses += 1
+            return value, freshness
+
+    def peek(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        with self._lock:
+            value, freshness = self._peek(key)
+            if freshness == "fresh" or (allow_stale and freshness == "stale"):
+                return value
+            return None
+
+    def _peek(self, key: str) -> Tuple[Optional[Any], str]:
+        entry = self._get_entry(key)
+        if not entry:
+            return None, "miss"
+        if entry.expires_at < time.time():
+            return entry.value, "stale"
+        return entry.value, "fresh"
+
+    def _get_entry(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        self._maybe_sweep(now)
         entry = self._store.get(key)
         if not entry:
             return None
-        if entry.expires_at < time.time():
-            self._store.pop(key, None)
+        if entry.stale_until < now:
+            self._remove(key)
+            self._expirations += 1
             return None
-        return entry.value
+        self._store.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, age: float = 0.0) -> None:
+        now = time.time()
+        expires_at = now - age + self.ttl_seconds
+        entry = CacheEntry(
+            value=value,
+            expires_at=expires_at,
+            stale_until=expires_at + self.max_stale_seconds,
+            size=self._sizeof(value),
+        )
+        with self._lock:
+            self._maybe_sweep(now)
+            self._remove(key)
+            self._store[key] = entry
+            self._bytes += entry.size
+            self._evict()
+
+    def sweep(self) -> int:
+        with self._lock:
+            now = time.time()
+            self._next_sweep = now + self.sweep_interval
+            expired = [key for key, entry in self._store.items() if entry.stale_until < now]
+            for key in expired:
+                self._remove(key)
+            self._expirations += len(expired)
+            return len(expired)
 
-    def set(self, key: str, value: Any) -> None:
-        self._store[key] = CacheEntry(value=value, expires_at=time.time() + self.ttl_seconds)
+    def _maybe_sweep(self, now: float) -> None:
+        if now >= self._next_sweep:
+            self.sweep()
+
+    def _evict(self) -> None:
+        while len(self._store) > 1 and self._over_budget():
+            self._remove(next(iter(self._store)))
+            self._evictions += 1
+
+    def _over_budget(self) -> bool:
+        if self.max_entries and len(self._store) > self.max_entries:
+            return True
+        return bool(self.max_bytes) and self._bytes > self.max_bytes
+
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key, None)
+        if entry:
+            self._bytes -= entry.size
 
     def clear(self) -> None:
-        self._store.clear()
+        with self._lock:
+            self._store.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "entries": len(self._store),
+                "bytes": self._bytes,
+            }
+
+
+class ResultCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._store: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._store.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._store.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._store[key] = value
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "size": len(self._store)}
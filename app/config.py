@@ -18,11 +18,30 @@ class Settings:
     telegram_bot_token: str
     cache_ttl: int
     rate_limit_per_min: int
+    rate_limit_backend: str
+    rate_limit_shared_path: str
+    rate_limit_max_keys: int
+    rate_limit_idle_seconds: int
     max_search_results: int
     log_level: str
     sentry_dsn: str
     max_sheet_rows: int
-
+    refresh_interval: int
+    cache_max_staleness: int
+    cache_max_entries: int
+    cache_max_bytes: int
+    cache_sweep_interval: int
+    worker_threads: int
+    snapshot_path: str
+    snapshot_max_age: int
+    snapshot_poll_interval: int
+    process_role: str
+    max_batch_size: int
+    result_cache_size: int
+    batch_items_per_token: int
+    bot_mode: str
+    telegram_webhook_url: str
+    telegram_webhook_secret: str
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -38,10 +57,30 @@ class Settings:
             telegram_bot_token=os.getenv("TELEGRAM_BOT_TOKEN", ""),
             cache_ttl=int(os.getenv("CACHE_TTL", "300")),
             rate_limit_per_min=int(os.getenv("RATE_LIMIT_PER_MIN", "60")),
+            rate_limit_backend=os.getenv("RATE_LIMIT_BACKEND", "memory"),
+            rate_limit_shared_path=os.getenv("RATE_LIMIT_SHARED_PATH", "/tmp/crm-access-ratelimit.bin"),
+            rate_limit_max_keys=int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000")),
+            rate_limit_idle_seconds=int(os.getenv("RATE_LIMIT_IDLE_SECONDS", "60")),
             max_search_results=int(os.getenv("MAX_SEARCH_RESULTS", "20")),
             log_level=log_level,
             sentry_dsn=os.getenv("SENTRY_DSN", ""),
             max_sheet_rows=int(os.getenv("MAX_SHEET_ROWS", "50000")),
+            refresh_interval=int(os.getenv("REFRESH_INTERVAL", "240")),
+            cache_max_staleness=int(os.getenv("CACHE_MAX_STALENESS", "1800")),
+            cache_max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+            cache_max_bytes=int(os.getenv("CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+            cache_sweep_interval=int(os.getenv("CACHE_SWEEP_INTERVAL", "60")),
+            worker_threads=int(os.getenv("WORKER_THREADS", "8")),
+            snapshot_path=os.getenv("SNAPSHOT_PATH", ""),
+            snapshot_max_age=int(os.getenv("SNAPSHOT_MAX_AGE", "86400")),
+            snapshot_poll_interval=int(os.getenv("SNAPSHOT_POLL_INTERVAL", "5")),
+            process_role=os.getenv("PROCESS_ROLE", "all"),
+            max_batch_size=int(os.getenv("MAX_BATCH_SIZE", "500")),
+            result_cache_size=int(os.getenv("RESULT_CACHE_SIZE", "1024")),
+            batch_items_per_token=int(os.getenv("BATCH_ITEMS_PER_TOKEN", "10")),
+            bot_mode=os.getenv("BOT_MODE", "polling"),
+            telegram_webhook_url=os.getenv("TELEGRAM_WEBHOOK_URL", ""),
+            telegram_webhook_secret=os.getenv("TELEGRAM_WEBHOOK_SECRET", ""),
         )
 
 
@@ -0,0 +1,121 @@
+import bisect
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "h", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "і": "i", "ї": "i", "є": "e", "ґ": "g",
+}
+_LATIN_FOLDS = (("kh", "h"), ("j", "y"), ("w", "v"), ("x", "ks"), ("y", "i"))
+
+MATCH_MODES = ("exact", "prefix", "fuzzy")
+
+
+def transliterate(value: str) -> str:
+    latin = "".join(_CYRILLIC_TO_LATIN.get(char, char) for char in value.strip().lower())
+    for source, target in _LATIN_FOLDS:
+        latin = latin.replace(source, target)
+    return "".join(char for char in latin if char.isalnum())
+
+
+def _bigrams(key: str) -> Set[str]:
+    padded = f"^{key}$"
+    return {padded[i : i + 2] for i in range(len(padded) - 1)}
+
+
+def _max_distance(key: str) -> int:
+    if len(key) <= 2:
+        return 0
+    if len(key) <= 5:
+        return 1
+    return 2
+
+
+def _distance(left: str, right: str, limit: int) -> int:
+    if len(left) > len(right):
+        left, right = right, left
+    too_far = limit + 1
+    if len(right) - len(left) > limit:
+        return too_far
+    if left == right:
+        return 0
+    width = len(right)
+    previous = [j if j <= limit else too_far for j in range(width + 1)]
+    for i, left_char in enumerate(left, 1):
+        low = max(1, i - limit)
+        high = min(width, i + limit)
+        current = [too_far] * (width + 1)
+        if i <= limit:
+            current[0] = i
+        best = current[low - 1]
+        for j in range(low, high + 1):
+            value = previous[j - 1] + (left_char != right[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            current[j] = value
+            if value < best:
+                best = value
+        if best > limit:
+            return too_far
+        previous = current
+    return min(previous[width], too_far)
+
+
+class FuzzySurnameIndex:
+    def __init__(self, surnames: Iterable[str]) -> None:
+        self.surnames: Dict[str, List[str]] = {}
+        for surname in surnames:
+            key = transliterate(surname)
+            if key:
+                self.surnames.setdefault(key, []).append(surname)
+        self.keys = sorted(self.surnames)
+        self.grams: Dict[str, List[str]] = {}
+        for key in self.keys:
+            for gram in _bigrams(key):
+                self.grams.setdefault(gram, []).append(key)
+
+    def prefix(self, query: str) -> List[str]:
+        key = transliterate(query)
+        if not key:
+            return []
+        matches = []
+        start = bisect.bisect_left(self.keys, key)
+        for candidate in self.keys[start:]:
+            if not candidate.startswith(key):
+                break
+            matches.append(((len(candidate) - len(key), candidate), candidate))
+        return self._expand(matches)
+
+    def fuzzy(self, query: str) -> List[str]:
+        key = transliterate(query)
+        if not key:
+            return []
+        limit = _max_distance(key)
+        grams = _bigrams(key)
+        # Each edit destroys at most two bigrams of the query.
+        required = len(grams) - 2 * limit
+        if required >= 1:
+            counts: Counter = Counter()
+            for gram in grams:
+                counts.update(self.grams.get(gram, ()))
+            candidates = [candidate for candidate, shared in counts.items() if shared >= required]
+        else:
+            candidates = self.keys
+        matches = []
+        for candidate in candidates:
+            if abs(len(candidate) - len(key)) > limit:
+                continue
+            distance = _distance(key, candidate, limit)
+            if distance <= limit:
+                matches.append(((distance, candidate), candidate))
+        return self._expand(matches)
+
+    def _expand(self, matches: List[Tuple[Tuple[int, str], str]]) -> List[str]:
+        matches.sort()
+        return [surname for _, key in matches for surname in self.surnames[key]]
@@ -0,0 +1,21 @@
+import asyncio
+
+from app.config import settings
+from app.logging_setup import get_logger, setup_logging
+from app.refresher import refresh_loop
+from app.search import restore_snapshot
+from app.sheets_client import sheets_client
+
+
+async def run_loader() -> None:
+    if not settings.snapshot_path:
+        raise RuntimeError("SNAPSHOT_PATH is required for the loader process")
+    restore_snapshot()
+    sheets_client.warm_up()
+    get_logger("loader").info("loader status=started interval=%s", settings.refresh_interval)
+    await refresh_loop(settings.refresh_interval, refresh_first=True)
+
+
+if __name__ == "__main__":
+    setup_logging(settings.log_level)
+    asyncio.run(run_loader())
@@ -4,29 +4,72 @@ from fastapi import FastAPI
 
 from app.api import router as api_router
 from app.config import settings
-from app.logging_setup import setup_logging
-from app.search import warm_cache
-from app.bot import start_bot_task
+from app.executor import run_blocking, shutdown_executor
+from app.logging_setup import get_logger, setup_logging
+from app.refresher import start_refresh_task, start_snapshot_watch_task
+from app.search import restore_snapshot, uses_published_snapshot, warm_cache
+from app.sheets_client import sheets_client
 
 
 setup_logging(settings.log_level)
+logger = get_logger("main")
 
 app = FastAPI(title="CRM Access API")
 app.include_router(api_router)
 
+if settings.telegram_bot_token and settings.bot_mode == "webhook":
+    from app.webhook import router as webhook_router
 
-@app.on_event("startup")
-async def on_startup() -> None:
+    app.include_router(webhook_router)
+
+
+async def _warm_sheets_service() -> None:
     try:
-        warm_cache()
+        await run_blocking(sheets_client.warm_up)
     except Exception:
-        pass
+        logger.warning("sheets_service status=unavailable")
+
+
+@app.on_event("startup")
+async def on_startup() -> None:
     loop = asyncio.get_event_loop()
-    app.state.bot_task = start_bot_task(loop)
+    if uses_published_snapshot():
+        app.state.refresh_task = start_snapshot_watch_task(loop)
+    else:
+        app.state.service_task = loop.create_task(_warm_sheets_service())
+        restored = await run_blocking(restore_snapshot)
+        if not restored:
+            try:
+                await run_blocking(warm_cache)
+            except Exception:
+                pass
+        app.state.refresh_task = start_refresh_task(loop, refresh_first=restored)
+    await _start_bot(loop)
+
+
+async def _start_bot(loop: asyncio.AbstractEventLoop) -> None:
+    if not settings.telegram_bot_token:
+        logger.info("bot status=disabled reason=no_token")
+        return
+    from app.bot import create_bot, create_dispatcher, start_bot_task
+
+    if settings.bot_mode == "webhook":
+        from app.webhook import start_webhook
+
+        app.state.telegram_webhook = await start_webhook(create_bot(), create_dispatcher())
+    elif not uses_published_snapshot():
+        app.state.bot_task = start_bot_task(loop)
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
-    task = getattr(app.state, "bot_task", None)
-    if task:
-        task.cancel()
+    for name in ("bot_task", "refresh_task", "service_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    webhook = getattr(app.state, "telegram_webhook", None)
+    if webhook:
+        from app.webhook import stop_webhook
+
+        await stop_webhook(webhook)
+    shutdown_executor()
@@ -9,9 +9,14 @@ class ApiRequest(BaseModel):
     surname: Optional[str] = None
     lastName: Optional[str] = None
     lastname: Optional[str] = None
+    mode: Optional[str] = None
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
     trip_id: Optional[str] = None
     tripId: Optional[str] = None
     trip: Optional[str] = None
+    surnames: Optional[List[str]] = None
+    trip_ids: Optional[List[str]] = None
 
 
 class SearchResult(BaseModel):
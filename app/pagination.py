@@ -0,0 +1,36 @@
+import base64
+import binascii
+import struct
+import zlib
+
+_CURSOR = struct.Struct("<QQI")
+
+
+class CursorExpiredError(Exception):
+    pass
+
+
+class InvalidQueryError(Exception):
+    pass
+
+
+def _query_check(query: str, mode: str) -> int:
+    return zlib.crc32(f"{mode}:{query}".encode("utf-8"))
+
+
+def encode_cursor(version: int, offset: int, query: str, mode: str) -> str:
+    raw = _CURSOR.pack(version, offset, _query_check(query, mode))
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, version: int, query: str, mode: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_version, offset, check = _CURSOR.unpack(raw)
+    except (binascii.Error, struct.error, ValueError) as exc:
+        raise InvalidQueryError("invalid cursor") from exc
+    if check != _query_check(query, mode):
+        raise InvalidQueryError("cursor does not match query")
+    if cursor_version != version:
+        raise CursorExpiredError("cursor expired")
+    return offset
@@ -0,0 +1,48 @@
+import asyncio
+import os
+
+from app.config import settings
+from app.executor import run_blocking
+from app.logging_setup import get_logger
+from app.search import cache, refresh_sheets, restore_snapshot
+
+logger = get_logger("refresher")
+
+
+async def refresh_loop(interval: float, refresh_first: bool = False) -> None:
+    if not refresh_first:
+        await asyncio.sleep(interval)
+    while True:
+        try:
+            await run_blocking(refresh_sheets)
+            logger.debug("refresh status=ok")
+        except Exception:
+            logger.warning("refresh status=error, serving last snapshot")
+        cache.sweep()
+        await asyncio.sleep(interval)
+
+
+def start_refresh_task(loop: asyncio.AbstractEventLoop, refresh_first: bool = False) -> asyncio.Task:
+    return loop.create_task(refresh_loop(settings.refresh_interval, refresh_first))
+
+
+async def snapshot_watch_loop(path: str, interval: float) -> None:
+    seen = None
+    while True:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != seen:
+            try:
+                if await run_blocking(restore_snapshot):
+                    seen = mtime
+                    logger.debug("snapshot status=attached")
+            except Exception:
+                logger.warning("snapshot status=attach_error")
+        cache.sweep()
+        await asyncio.sleep(interval)
+
+
+def start_snapshot_watch_task(loop: asyncio.AbstractEventLoop) -> asyncio.Task:
+    return loop.create_task(snapshot_watch_loop(settings.snapshot_path, settings.snapshot_poll_interval))
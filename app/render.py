@@ -0,0 +1,123 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+TELEGRAM_CALLBACK_DATA_LIMIT = 64
+MAX_SEND_ATTEMPTS = 4
+MORE_CALLBACK_PREFIX = "more:"
+
+
+def chunk_messages(texts: Iterable[str], limit: int = TELEGRAM_MESSAGE_LIMIT, separator: str = "\n\n") -> List[str]:
+    chunks: List[str] = []
+    current = ""
+    for text in texts:
+        for part in _split_long(text, limit):
+            if not current:
+                current = part
+            elif len(current) + len(separator) + len(part) <= limit:
+                current = current + separator + part
+            else:
+                chunks.append(current)
+                current = part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(text: str, limit: int) -> List[str]:
+    if len(text) <= limit:
+        return [text]
+    parts: List[str] = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:limit])
+            line = line[limit:]
+        if not current:
+            current = line
+        elif len(current) + 1 + len(line) <= limit:
+            current = current + "\n" + line
+        else:
+            parts.append(current)
+            current = line
+    if current:
+        parts.append(current)
+    return parts
+
+
+def render_trip(result: Dict[str, Any]) -> str:
+    trip = (result.get("trips") or [{}])[0]
+    tourist = trip.get("main_tourist", {})
+    header = [f"Заказ {trip.get('trip_id', '')}", trip.get("destination"), trip.get("start_date")]
+    lines = [" · ".join(value for value in header if value)]
+    name = _join(tourist.get("last_name"), tourist.get("first_name"))
+    if name:
+        lines.append(f"Турист: {name}")
+    total = _join(trip.get("total"), trip.get("currency"))
+    if total:
+        lines.append(f"Сумма: {total}")
+    clients = result.get("clients", [])
+    if clients:
+        lines.append(f"Клиенты ({len(clients)}):")
+    for number, client in enumerate(clients, 1):
+        line = f"{number}. {_join(client.get('last_name'), client.get('first_name')) or 'без имени'}"
+        if client.get("client_id"):
+            line += f" ({client['client_id']})"
+        if client.get("amount"):
+            line += f" — {client['amount']}"
+        lines.append(line)
+        for contact in client.get("contacts", []):
+            details = ", ".join(value for value in (contact.get("phone"), contact.get("email")) if value)
+            if details:
+                lines.append(f"   {details}")
+    return "\n".join(lines)
+
+
+def more_callback_data(surname: str, mode: str, cursor: str) -> Optional[str]:
+    data = f"{MORE_CALLBACK_PREFIX}{mode}:{cursor}:{surname}"
+    if len(data.encode("utf-8")) > TELEGRAM_CALLBACK_DATA_LIMIT:
+        return None
+    return data
+
+
+def parse_more_callback(data: str) -> Tuple[str, str, str]:
+    if not data.startswith(MORE_CALLBACK_PREFIX) or data.count(":") < 3:
+        raise ValueError("invalid callback data")
+    _, mode, cursor, surname = data.split(":", 3)
+    return surname, mode, cursor
+
+
+def render_page_footer(result: Dict[str, Any], has_button: bool) -> str:
+    shown = result.get("offset", 0) + result.get("count", 0)
+    footer = f"Показано {shown} из {result.get('total', shown)}."
+    if has_button:
+        return footer
+    return footer + " Уточните запрос, чтобы увидеть остальные."
+
+
+def _join(*values: Any) -> str:
+    return " ".join(str(value) for value in values if value)
+
+
+async def send_chunks(
+    bot: Any,
+    chat_id: int,
+    chunks: List[str],
+    sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    reply_markup: Any = None,
+) -> None:
+    # Chunks go out one by one: concurrent sends would reorder them in the chat.
+    for number, chunk in enumerate(chunks, 1):
+        extra = {"reply_markup": reply_markup} if reply_markup is not None and number == len(chunks) else {}
+        for attempt in range(MAX_SEND_ATTEMPTS):
+            try:
+                await bot.send_message(chat_id, chunk, **extra)
+                break
+            except Exception as exc:
+                retry_after = getattr(exc, "retry_after", None)
+                if retry_after is None or attempt == MAX_SEND_ATTEMPTS - 1:
+                    raise
+                await sleep(float(retry_after))
@@ -0,0 +1,36 @@
+from typing import Any, AsyncIterator, Iterator
+
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.executor import run_blocking
+from app.logging_setup import get_logger
+from app.serialization import dumps, ndjson_chunk
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CHUNK_ITEMS = 50
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def wants_ndjson(accept: str) -> bool:
+    return NDJSON_MEDIA_TYPE in (accept or "")
+
+
+def ndjson_response(items: Iterator[Any]) -> StreamingResponse:
+    return StreamingResponse(_ndjson_stream(items), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def _ndjson_stream(items: Iterator[Any]) -> AsyncIterator[bytes]:
+    while True:
+        try:
+            chunk = await run_blocking(ndjson_chunk, items, NDJSON_CHUNK_ITEMS)
+        except Exception:
+            get_logger("api").error("action=stream status=error")
+            yield dumps({"status": "error", "error": "internal error"}) + b"\n"
+            return
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,77 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.sheets_client import get_header_map, pick_header
+
+FIELD_OPTIONS: Dict[str, List[str]] = {
+    "trip_id": ["trip_id", "trip id"],
+    "client_id": ["client_id", "client id", "id"],
+    "last_name": ["lastname", "last name"],
+    "first_name": ["firstname", "first name"],
+    "start_date": ["startdate", "start date"],
+    "destination": ["destination"],
+    "total": ["total", "amount"],
+    "amount": ["amount", "total"],
+    "currency": ["currency"],
+    "phone": ["phone", "mobile"],
+    "email": ["email"],
+}
+
+SHEET_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "Trips": ("trip_id", "last_name", "first_name", "start_date", "destination", "total", "currency"),
+    "Profile": ("trip_id", "client_id", "last_name", "first_name", "amount"),
+    "Contacts": ("trip_id", "client_id", "phone", "email"),
+}
+
+REQUIRED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "Trips": ("trip_id", "last_name"),
+    "Profile": ("trip_id", "client_id"),
+    "Contacts": ("trip_id",),
+}
+
+
+@dataclass(frozen=True)
+class SheetSchema:
+    sheet_name: str = ""
+    columns: Dict[str, int] = field(default_factory=dict)
+    missing_required: Tuple[str, ...] = ()
+    missing_optional: Tuple[str, ...] = ()
+
+    def index(self, field_name: str) -> Optional[int]:
+        return self.columns.get(field_name)
+
+    def remap(self, positions: Dict[int, int]) -> "SheetSchema":
+        return SheetSchema(
+            sheet_name=self.sheet_name,
+            columns={name: positions[idx] for name, idx in self.columns.items()},
+            missing_required=self.missing_required,
+            missing_optional=self.missing_optional,
+        )
+
+
+def compile_schema(sheet_name: str, header_map: Dict[str, int]) -> SheetSchema:
+    columns: Dict[str, int] = {}
+    missing_required: List[str] = []
+    missing_optional: List[str] = []
+    required = REQUIRED_FIELDS.get(sheet_name, ())
+    for field_name in SHEET_FIELDS.get(sheet_name, ()):
+        idx = pick_header(header_map, FIELD_OPTIONS[field_name])
+        if idx is not None:
+            columns[field_name] = idx
+        elif field_name in required:
+            missing_required.append(field_name)
+        else:
+            missing_optional.append(field_name)
+    return SheetSchema(
+        sheet_name=sheet_name,
+        columns=columns,
+        missing_required=tuple(missing_required),
+        missing_optional=tuple(missing_optional),
+    )
+
+
+def projected_columns(sheet_name: str, header_row: List[Any]) -> Optional[List[int]]:
+    if sheet_name not in SHEET_FIELDS:
+        return None
+    _, _, header_map = get_header_map([header_row])
+    return sorted(set(compile_schema(sheet_name, header_map).columns.values()))
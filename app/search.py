@@ -1,24 +1,141 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import bisect
+import functools
+import hashlib
+import itertools
+import os
+import sys
+import time
+import zlib
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from zoneinfo import ZoneInfo
-
-from app.cache import TTLCache
+from app import metrics
+from app.cache import ResultCache, TTLCache
 from app.config import settings
-from app.sheets_client import get_header_map, pick_header, sheets_client
+from app.fuzzy import MATCH_MODES, FuzzySurnameIndex
+from app.logging_setup import get_logger
+from app.pagination import InvalidQueryError, decode_cursor, encode_cursor
+from app.schema import FIELD_OPTIONS, SHEET_FIELDS, SheetSchema, compile_schema
+from app.singleflight import SingleFlight
+from app.snapshot import load_snapshot, save_snapshot
+from app.sheets_client import get_header_map, sheets_client
+
+
+@dataclass
+class SheetPatch:
+    base_version: int
+    old_rows: Dict[int, Optional[Tuple[Any, ...]]]
 
 
 @dataclass
 class SheetData:
     headers: List[str]
-    rows: List[List[Any]]
+    columns: List[Tuple[Any, ...]]
     header_map: Dict[str, int]
+    row_count: int
+    source_columns: Tuple[int, ...] = ()
+    fingerprints: Tuple[int, ...] = ()
+    patch: Optional[SheetPatch] = None
+    surname_index: Dict[str, List[int]] = field(default_factory=dict)
+    fuzzy_index: Optional[FuzzySurnameIndex] = None
+    schema: SheetSchema = field(default_factory=SheetSchema)
+    version: int = field(default_factory=lambda: _new_version())
+
+    def row(self, position: int) -> Tuple[Any, ...]:
+        return tuple(column[position] for column in self.columns)
+
+    def text(self, position: int, field_name: str) -> str:
+        idx = self.schema.columns.get(field_name)
+        if idx is None:
+            return ""
+        value = self.columns[idx][position]
+        return value if isinstance(value, str) else str(value)
+
+    def row_or_none(self, position: int) -> Optional[Tuple[Any, ...]]:
+        if position >= self.row_count:
+            return None
+        return self.row(position)
+
+
+@dataclass
+class TripIndex:
+    source_versions: Tuple[int, int, int]
+    trips: Dict[str, List[int]]
+    profiles: Dict[str, List[int]]
+    contacts: Dict[str, Dict[str, List[int]]]
+
+
+@dataclass
+class TripSnapshot:
+    trips: SheetData
+    profile: SheetData
+    contacts: SheetData
+    timezone: str
+    index: TripIndex
+
+
+SHEET_NAMES = ("Trips", "Profile", "Contacts")
+
+_SNAPSHOT_LAYOUT = 5
+_SNAPSHOT_SCHEMA = zlib.crc32(repr((_SNAPSHOT_LAYOUT, SHEET_FIELDS, FIELD_OPTIONS)).encode("utf-8"))
+_FINGERPRINT_BLOCK = 512
+
+cache = TTLCache(
+    settings.cache_ttl,
+    settings.cache_max_staleness,
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes,
+    sweep_interval=settings.cache_sweep_interval,
+    sizeof=lambda value: _approx_size(value),
+)
+flights = SingleFlight()
+results_cache = ResultCache(settings.result_cache_size)
+logger = get_logger("search")
+_last_refresh_at = 0.0
+
+SHEET_LOOKUPS = metrics.counter(
+    "crm_sheet_lookups_total",
+    "Sheet cache lookups by result (fresh, stale or miss).",
+    ("result",),
+)
+
+
+def _new_version() -> int:
+    # Random rather than a counter: versions end up in pagination cursors,
+    # which must not match a sheet built by another worker or after a restart.
+    return int.from_bytes(os.urandom(8), "little")
+
+
+def _approx_size(value: Any) -> int:
+    if isinstance(value, SheetData):
+        return sum(_column_size(column) for column in value.columns)
+    if isinstance(value, TripIndex):
+        return sum(_grouped_size(group) for group in (value.trips, value.profiles, value.contacts))
+    return sys.getsizeof(value)
 
 
-cache = TTLCache(settings.cache_ttl)
+def _grouped_size(group: Dict[str, Any]) -> int:
+    sample = list(itertools.islice(group.items(), 256))
+    if not sample:
+        return sys.getsizeof(group)
+    per_key = sum(sys.getsizeof(key) + _positions_size(positions) for key, positions in sample) // len(sample)
+    return sys.getsizeof(group) + len(group) * per_key
+
+
+def _positions_size(positions: Any) -> int:
+    if isinstance(positions, dict):
+        return _grouped_size(positions)
+    return sys.getsizeof(positions) + sum(map(sys.getsizeof, positions))
+
+
+def _column_size(column: Tuple[Any, ...]) -> int:
+    sample = column[:256]
+    if not sample:
+        return sys.getsizeof(column)
+    return sys.getsizeof(column) + len(column) * sum(map(sys.getsizeof, sample)) // len(sample)
 
 
 def _limit_rows(rows: List[List[Any]]) -> List[List[Any]]:
@@ -29,42 +146,214 @@ def _limit_rows(rows: List[List[Any]]) -> List[List[Any]]:
 
 def _load_sheet(sheet_name: str) -> SheetData:
     cache_key = f"sheet:{sheet_name}"
-    cached = cache.get(cache_key)
-    if cached:
+    cached, freshness = cache.lookup(cache_key)
+    SHEET_LOOKUPS.inc(result=freshness)
+    if freshness == "stale":
+        logger.debug("sheet=%s status=stale", sheet_name)
+    if cached is not None:
         return cached
-    raw = sheets_client.read_sheet(sheet_name)
+    return flights.do(cache_key, _load_missing_sheet, sheet_name)
+
+
+def _load_missing_sheet(sheet_name: str) -> SheetData:
+    cached = cache.peek(f"sheet:{sheet_name}")
+    if cached is not None:
+        return cached
+    if uses_published_snapshot():
+        return _from_published_snapshot(f"sheet:{sheet_name}")
+    return _fetch_sheet(sheet_name)
+
+
+def uses_published_snapshot() -> bool:
+    return settings.process_role in ("api", "bot")
+
+
+def _from_published_snapshot(cache_key: str) -> Any:
+    restore_snapshot()
+    value = cache.peek(cache_key, allow_stale=True)
+    if value is None:
+        raise RuntimeError("sheet snapshot unavailable")
+    return value
+
+
+def _fetch_sheet(sheet_name: str) -> SheetData:
+    return _store_sheet(sheet_name, sheets_client.read_sheet(sheet_name))
+
+
+def _store_sheet(sheet_name: str, raw: List[List[Any]]) -> SheetData:
+    cache_key = f"sheet:{sheet_name}"
+    data = _refresh_sheet_data(sheet_name, raw, cache.peek(cache_key, allow_stale=True))
+    cache.set(cache_key, data)
+    return data
+
+
+def _refresh_sheet_data(sheet_name: str, raw: List[List[Any]], previous: Optional[SheetData]) -> SheetData:
     headers, rows, header_map = get_header_map(raw)
     rows = _limit_rows(rows)
-    data = SheetData(headers=headers, rows=rows, header_map=header_map)
-    cache.set(cache_key, data)
+    fingerprints = _fingerprint(raw[:1], rows)
+    if previous and previous.fingerprints == fingerprints:
+        logger.debug("sheet=%s status=unchanged", sheet_name)
+        return previous
+    if previous and previous.fingerprints[:1] == fingerprints[:1]:
+        patched = _patch_sheet(sheet_name, previous, rows, fingerprints)
+        if patched:
+            logger.debug("sheet=%s status=patched rows=%s", sheet_name, len(patched.patch.old_rows))
+            return patched
+    data = _compact_sheet(sheet_name, headers, rows, header_map)
+    data.fingerprints = fingerprints
+    _log_schema_problems(data.schema)
+    if sheet_name == "Trips":
+        data.surname_index = _build_surname_index(data)
+        data.fuzzy_index = FuzzySurnameIndex(data.surname_index)
     return data
 
 
-def warm_cache() -> None:
-    for sheet_name in ("Trips", "Profile", "Contacts"):
-        _load_sheet(sheet_name)
-    _get_timezone()
+def _fingerprint(header_rows: List[List[Any]], rows: List[List[Any]]) -> Tuple[int, ...]:
+    blocks = [_digest(header_rows)]
+    for start in range(0, len(rows), _FINGERPRINT_BLOCK):
+        blocks.append(_digest(rows[start : start + _FINGERPRINT_BLOCK]))
+    return tuple(blocks)
 
 
-def _get_timezone() -> str:
-    cache_key = "sheet:timezone"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
-    tz = sheets_client.get_timezone()
-    cache.set(cache_key, tz)
-    return tz
+def _digest(rows: List[List[Any]]) -> int:
+    # repr() keeps the cell types apart, unlike hash() where -1 == -2 and 1 == True,
+    # and is stable across processes, so restored snapshots still match.
+    digest = hashlib.blake2b(repr(rows).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _changed_positions(old: Tuple[int, ...], new: Tuple[int, ...], row_count: int) -> List[int]:
+    positions: List[int] = []
+    for block in range(max(len(old), len(new)) - 1):
+        if block + 1 < len(old) and block + 1 < len(new) and old[block + 1] == new[block + 1]:
+            continue
+        start = block * _FINGERPRINT_BLOCK
+        positions.extend(range(start, min(start + _FINGERPRINT_BLOCK, row_count)))
+    return positions
+
+
+def _patch_sheet(
+    sheet_name: str,
+    previous: SheetData,
+    rows: List[List[Any]],
+    fingerprints: Tuple[int, ...],
+) -> Optional[SheetData]:
+    row_count = len(rows)
+    changed = _changed_positions(previous.fingerprints, fingerprints, max(row_count, previous.row_count))
+    if len(changed) > max(row_count, previous.row_count) // 2:
+        return None
+    old_rows = {position: previous.row_or_none(position) for position in changed}
+    converters = _column_converters(previous.schema)
+    columns: List[Tuple[Any, ...]] = []
+    for column_idx, (column, source_idx) in enumerate(zip(previous.columns, previous.source_columns)):
+        convert = converters.get(column_idx, _compact_value)
+        values = list(column[:row_count])
+        for position in changed:
+            if position >= row_count:
+                break
+            row = rows[position]
+            value = convert(row[source_idx]) if source_idx < len(row) else ""
+            if position < len(values):
+                values[position] = value
+            else:
+                values.append(value)
+        columns.append(tuple(values))
+    data = SheetData(
+        headers=previous.headers,
+        columns=columns,
+        header_map=previous.header_map,
+        row_count=row_count,
+        source_columns=previous.source_columns,
+        fingerprints=fingerprints,
+        patch=SheetPatch(base_version=previous.version, old_rows=old_rows),
+        schema=previous.schema,
+    )
+    if sheet_name == "Trips":
+        last_idx = data.schema.index("last_name")
+        data.surname_index = _patch_grouped(
+            previous.surname_index,
+            (
+                (_surname_key(old_row, last_idx), _surname_key(data.row_or_none(position), last_idx), position)
+                for position, old_row in old_rows.items()
+            ),
+        )
+        data.fuzzy_index = FuzzySurnameIndex(data.surname_index)
+    return data
+
+
+def _surname_key(row: Optional[Tuple[Any, ...]], idx: Optional[int]) -> Optional[str]:
+    if row is None or idx is None:
+        return None
+    return _normalize_surname(_cell(row, idx))
+
+
+def _row_key(row: Optional[Tuple[Any, ...]], idx: Optional[int]) -> Optional[str]:
+    if row is None:
+        return None
+    return _cell(row, idx)
+
+
+def _patch_grouped(
+    index: Dict[Hashable, List[int]],
+    changes: Iterable[Tuple[Optional[Hashable], Optional[Hashable], int]],
+) -> Dict[Hashable, List[int]]:
+    patched = dict(index)
+    copied = set()
 
+    def bucket(key: Hashable) -> List[int]:
+        if key not in copied:
+            patched[key] = list(patched.get(key, []))
+            copied.add(key)
+        return patched[key]
 
-def _format_date(value: Any, tz_name: str) -> str:
+    for old_key, new_key, position in changes:
+        if old_key == new_key:
+            continue
+        if old_key is not None:
+            bucket(old_key).remove(position)
+        if new_key is not None:
+            bisect.insort(bucket(new_key), position)
+    for key in copied:
+        if not patched[key]:
+            del patched[key]
+    return patched
+
+
+def _compact_sheet(
+    sheet_name: str,
+    headers: List[str],
+    rows: List[List[Any]],
+    header_map: Dict[str, int],
+) -> SheetData:
+    source_schema = compile_schema(sheet_name, header_map)
+    kept = sorted(set(source_schema.columns.values()))
+    positions = {source_idx: position for position, source_idx in enumerate(kept)}
+    converters = _column_converters(source_schema)
+    columns = [
+        tuple(convert(row[source_idx]) if source_idx < len(row) else "" for row in rows)
+        for source_idx, convert in ((idx, converters.get(idx, _compact_value)) for idx in kept)
+    ]
+    return SheetData(
+        headers=[headers[source_idx] for source_idx in kept],
+        columns=columns,
+        header_map={
+            name: positions[source_idx]
+            for name, source_idx in header_map.items()
+            if source_idx in positions
+        },
+        row_count=len(rows),
+        source_columns=tuple(kept),
+        schema=source_schema.remap(positions),
+    )
+
+
+@functools.lru_cache(maxsize=16384)
+def _normalize_date(value: Any) -> str:
     if value is None or value == "":
         return ""
     if isinstance(value, (int, float)):
-        base = datetime(1899, 12, 30)
-        date_value = base + timedelta(days=float(value))
-        tz = ZoneInfo(tz_name)
-        localized = date_value.replace(tzinfo=tz)
-        return localized.strftime("%Y-%m-%d")
+        date_value = datetime(1899, 12, 30) + timedelta(days=float(value))
+        return sys.intern(date_value.strftime("%Y-%m-%d"))
     if isinstance(value, str):
         raw = value.strip()
         if not raw:
@@ -72,34 +361,344 @@ def _format_date(value: Any, tz_name: str) -> str:
         for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y"):
             try:
                 parsed = datetime.strptime(raw, fmt)
-                return parsed.strftime("%Y-%m-%d")
+                return sys.intern(parsed.strftime("%Y-%m-%d"))
             except ValueError:
                 continue
-        return raw
+        return sys.intern(raw)
     return str(value)
 
 
-def search_by_surname(surname: str) -> Dict[str, Any]:
-    surname = surname.strip()
+_FIELD_CONVERTERS: Dict[str, Callable[[Any], Any]] = {"start_date": _normalize_date}
+
+
+def _column_converters(schema: SheetSchema) -> Dict[int, Callable[[Any], Any]]:
+    return {
+        idx: _FIELD_CONVERTERS[field_name]
+        for field_name, idx in schema.columns.items()
+        if field_name in _FIELD_CONVERTERS
+    }
+
+
+def _log_schema_problems(schema: SheetSchema) -> None:
+    if schema.missing_required:
+        logger.error(
+            "sheet=%s status=schema_invalid missing=%s", schema.sheet_name, ",".join(schema.missing_required)
+        )
+    if schema.missing_optional:
+        logger.warning(
+            "sheet=%s status=schema_incomplete missing=%s", schema.sheet_name, ",".join(schema.missing_optional)
+        )
+
+
+def _compact_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return sys.intern(value.strip())
+    return value
+
+
+def _normalize_surname(value: str) -> str:
+    return value.strip().lower()
+
+
+def _build_surname_index(sheet: SheetData) -> Dict[str, List[int]]:
+    last_idx = sheet.schema.index("last_name")
+    index: Dict[str, List[int]] = {}
+    if last_idx is None:
+        return index
+    for position, value in enumerate(sheet.columns[last_idx]):
+        key = _normalize_surname(str(value))
+        index.setdefault(key, []).append(position)
+    return index
+
+
+def _get_trip_index(trips_sheet: SheetData, profile_sheet: SheetData, contacts_sheet: SheetData) -> TripIndex:
+    cache_key = "index:trips"
+    versions = (trips_sheet.version, profile_sheet.version, contacts_sheet.version)
+    cached = cache.get_stale(cache_key)
+    if cached and cached.source_versions == versions:
+        return cached
+    index = None
+    if cached:
+        index = _patch_trip_index(cached, trips_sheet, profile_sheet, contacts_sheet)
+    if index is None:
+        index = _build_trip_index(trips_sheet, profile_sheet, contacts_sheet)
+    cache.set(cache_key, index)
+    return index
+
+
+def _patch_trip_index(
+    cached: TripIndex,
+    trips_sheet: SheetData,
+    profile_sheet: SheetData,
+    contacts_sheet: SheetData,
+) -> Optional[TripIndex]:
+    sheets = (trips_sheet, profile_sheet, contacts_sheet)
+    for sheet, base_version in zip(sheets, cached.source_versions):
+        if sheet.version == base_version:
+            continue
+        if not sheet.patch or sheet.patch.base_version != base_version:
+            return None
+
+    trips = cached.trips
+    if trips_sheet.patch and trips_sheet.version != cached.source_versions[0]:
+        trips = _patch_grouped(trips, _key_changes(trips_sheet, trips_sheet.schema.index("trip_id")))
+
+    profiles = cached.profiles
+    if profile_sheet.patch and profile_sheet.version != cached.source_versions[1]:
+        profiles = _patch_grouped(profiles, _key_changes(profile_sheet, profile_sheet.schema.index("trip_id")))
+
+    contacts = cached.contacts
+    if contacts_sheet.patch and contacts_sheet.version != cached.source_versions[2]:
+        contacts_trip_idx = contacts_sheet.schema.index("trip_id")
+        contact_client_idx = contacts_sheet.schema.index("client_id")
+        changes_by_trip: Dict[str, List[Tuple[Optional[str], Optional[str], int]]] = {}
+        for position, old_row in contacts_sheet.patch.old_rows.items():
+            new_row = contacts_sheet.row_or_none(position)
+            old_key = None if old_row is None else (_cell(old_row, contacts_trip_idx), _cell(old_row, contact_client_idx))
+            new_key = None if new_row is None else (_cell(new_row, contacts_trip_idx), _cell(new_row, contact_client_idx))
+            if old_key == new_key:
+                continue
+            if old_key is not None:
+                changes_by_trip.setdefault(old_key[0], []).append((old_key[1], None, position))
+            if new_key is not None:
+                changes_by_trip.setdefault(new_key[0], []).append((None, new_key[1], position))
+        contacts = dict(contacts)
+        for trip_key, changes in changes_by_trip.items():
+            by_client = _patch_grouped(contacts.get(trip_key, {}), changes)
+            if by_client:
+                contacts[trip_key] = by_client
+            else:
+                contacts.pop(trip_key, None)
+
+    return TripIndex(
+        source_versions=(trips_sheet.version, profile_sheet.version, contacts_sheet.version),
+        trips=trips,
+        profiles=profiles,
+        contacts=contacts,
+    )
+
+
+def _key_changes(sheet: SheetData, idx: Optional[int]) -> List[Tuple[Optional[str], Optional[str], int]]:
+    return [
+        (_row_key(old_row, idx), _row_key(sheet.row_or_none(position), idx), position)
+        for position, old_row in sheet.patch.old_rows.items()
+    ]
+
+
+def _build_trip_index(trips_sheet: SheetData, profile_sheet: SheetData, contacts_sheet: SheetData) -> TripIndex:
+    trip_ids = _column_text(trips_sheet, trips_sheet.schema.index("trip_id"))
+    trips: Dict[str, List[int]] = {}
+    for position, trip_key in enumerate(trip_ids):
+        trips.setdefault(trip_key, []).append(position)
+
+    profile_trip_ids = _column_text(profile_sheet, profile_sheet.schema.index("trip_id"))
+    profiles: Dict[str, List[int]] = {}
+    for position, trip_key in enumerate(profile_trip_ids):
+        profiles.setdefault(trip_key, []).append(position)
+
+    contact_trip_ids = _column_text(contacts_sheet, contacts_sheet.schema.index("trip_id"))
+    contact_client_ids = _column_text(contacts_sheet, contacts_sheet.schema.index("client_id"))
+    contacts: Dict[str, Dict[str, List[int]]] = {}
+    for position, (trip_key, client_key) in enumerate(zip(contact_trip_ids, contact_client_ids)):
+        by_client = contacts.setdefault(trip_key, {})
+        by_client.setdefault(client_key, []).append(position)
+
+    return TripIndex(
+        source_versions=(trips_sheet.version, profile_sheet.version, contacts_sheet.version),
+        trips=trips,
+        profiles=profiles,
+        contacts=contacts,
+    )
+
+
+def _column_text(sheet: SheetData, idx: Optional[int]) -> List[str]:
+    if idx is None:
+        return [""] * sheet.row_count
+    return [value if isinstance(value, str) else str(value) for value in sheet.columns[idx]]
+
+
+def _cache_hit_ratios() -> Dict[Tuple[str, ...], float]:
+    fresh = SHEET_LOOKUPS.value(result="fresh") + SHEET_LOOKUPS.value(result="stale")
+    sheet_total = fresh + SHEET_LOOKUPS.value(result="miss")
+    results = results_cache.stats()
+    results_total = results["hits"] + results["misses"]
+    return {
+        ("sheets",): fresh / sheet_total if sheet_total else 0.0,
+        ("results",): results["hits"] / results_total if results_total else 0.0,
+    }
+
+
+def _last_refresh_age() -> Dict[Tuple[str, ...], float]:
+    if not _last_refresh_at:
+        return {}
+    return {(): time.time() - _last_refresh_at}
+
+
+metrics.gauge("crm_cache_hit_ratio", "Share of lookups answered from cache.", _cache_hit_ratios, ("cache",))
+metrics.gauge(
+    "crm_cache_entries",
+    "Entries held by each cache.",
+    lambda: {("sheets",): cache.stats()["entries"], ("results",): results_cache.stats()["size"]},
+    ("cache",),
+)
+metrics.gauge("crm_sheets_last_refresh_age_seconds", "Seconds since sheets were last loaded.", _last_refresh_age)
+metrics.callback_counter(
+    "crm_singleflight_calls_total",
+    "Sheet loads executed versus coalesced into an in-flight load.",
+    lambda: {("executed",): flights.stats()["executed"], ("coalesced",): flights.stats()["coalesced"]},
+    ("result",),
+)
+
+
+def warm_cache() -> None:
+    refresh_sheets()
+
+
+def refresh_sheets() -> None:
+    flights.do("sheets:refresh", _fetch_all_sheets)
+
+
+def _fetch_all_sheets() -> None:
+    global _last_refresh_at
+    raw_sheets = sheets_client.read_sheets(SHEET_NAMES)
+    sheets = [_store_sheet(sheet_name, raw_sheets.get(sheet_name, [])) for sheet_name in SHEET_NAMES]
+    tz_name = _reload_timezone()
+    index = _get_trip_index(*sheets)
+    _last_refresh_at = time.time()
+    if settings.snapshot_path:
+        _write_snapshot(sheets, tz_name, index)
+
+
+def _write_snapshot(sheets: List[SheetData], tz_name: str, index: TripIndex) -> None:
+    payload = {
+        "sheets": dict(zip(SHEET_NAMES, sheets)),
+        "timezone": tz_name,
+        "trip_index": index,
+        "refreshed_at": _last_refresh_at,
+    }
+    try:
+        save_snapshot(settings.snapshot_path, _SNAPSHOT_SCHEMA, payload)
+    except OSError:
+        logger.warning("snapshot status=write_error")
+
+
+def restore_snapshot() -> bool:
+    global _last_refresh_at
+    if not settings.snapshot_path:
+        return False
+    try:
+        payload = load_snapshot(settings.snapshot_path, _SNAPSHOT_SCHEMA, settings.snapshot_max_age)
+    except Exception:
+        logger.warning("snapshot status=read_error")
+        return False
+    if not payload:
+        return False
+    age = 0.0
+    if uses_published_snapshot():
+        # Workers only serve what the loader published, so the staleness limit counts from its last load.
+        age = max(0.0, time.time() - payload.get("refreshed_at", 0.0))
+        if age > settings.cache_ttl + settings.cache_max_staleness:
+            logger.warning("snapshot status=too_old age=%d", age)
+            return False
+    sheets = payload["sheets"]
+    for sheet_name in SHEET_NAMES:
+        cache.set(f"sheet:{sheet_name}", sheets[sheet_name], age)
+    cache.set("sheet:timezone", payload["timezone"], age)
+    cache.set("index:trips", payload["trip_index"], age)
+    _last_refresh_at = payload.get("refreshed_at", 0.0)
+    return True
+
+
+def _get_timezone() -> str:
+    cache_key = "sheet:timezone"
+    cached, _ = cache.lookup(cache_key)
+    if cached:
+        return cached
+    return flights.do(cache_key, _load_missing_timezone)
+
+
+def _load_missing_timezone() -> str:
+    cached = cache.peek("sheet:timezone")
+    if cached:
+        return cached
+    if uses_published_snapshot():
+        return _from_published_snapshot("sheet:timezone")
+    return _fetch_timezone()
+
+
+def _reload_timezone() -> str:
+    return flights.do("sheet:timezone", _fetch_timezone)
+
+
+def _fetch_timezone() -> str:
+    cache_key = "sheet:timezone"
+    tz = sheets_client.get_timezone()
+    cache.set(cache_key, tz)
+    return tz
+
+
+def search_by_surname(
+    surname: str,
+    mode: str = "exact",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    if mode not in MATCH_MODES:
+        raise InvalidQueryError(f"unknown search mode: {mode}")
+    return _search(_load_sheet("Trips"), surname, mode, cursor, limit)
+
+
+def search_batch(surnames: List[str], mode: str = "exact") -> Dict[str, Any]:
+    items = list(iter_search_batch(surnames, mode))
+    return {"status": "ok", "count": len(items), "items": items}
+
+
+def iter_search_batch(surnames: List[str], mode: str = "exact") -> Iterator[Dict[str, Any]]:
+    if mode not in MATCH_MODES:
+        raise InvalidQueryError(f"unknown search mode: {mode}")
     sheet = _load_sheet("Trips")
-    tz_name = _get_timezone()
-    last_idx = pick_header(sheet.header_map, ["lastname", "last name"])
-    first_idx = pick_header(sheet.header_map, ["firstname", "first name"])
-    trip_idx = pick_header(sheet.header_map, ["trip_id", "trip id"])
-    start_idx = pick_header(sheet.header_map, ["startdate", "start date"])
-    dest_idx = pick_header(sheet.header_map, ["destination"])
+    return (_search_batch_item(sheet, surname, mode) for surname in surnames)
+
 
+def _search_batch_item(sheet: SheetData, surname: str, mode: str) -> Dict[str, Any]:
+    if not surname or not surname.strip():
+        return {"key": surname, "status": "error", "error": "surname missing"}
+    return {"key": surname, "status": "ok", "result": _search(sheet, surname, mode)}
+
+
+def _search(
+    sheet: SheetData,
+    surname: str,
+    mode: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    surname = surname.strip()
+    query = _normalize_surname(surname)
+    offset = decode_cursor(cursor, sheet.version, query, mode) if cursor else 0
+    page_size = min(limit or settings.max_search_results, settings.max_search_results)
+    memo_key = ("search", query, mode, sheet.version, offset, page_size)
+    cached = results_cache.get(memo_key)
+    if cached is None:
+        cached = _build_search(sheet, surname, mode, offset, page_size)
+        results_cache.set(memo_key, cached)
+    return dict(cached)
+
+
+def _build_search(sheet: SheetData, surname: str, mode: str, offset: int, page_size: int) -> Dict[str, Any]:
     results: List[Dict[str, Any]] = []
     text_messages: List[str] = []
-
-    for row in sheet.rows:
-        last_name = _cell(row, last_idx)
-        if last_name.strip().lower() != surname.lower():
-            continue
-        trip_id = _cell(row, trip_idx)
-        first_name = _cell(row, first_idx)
-        destination = _cell(row, dest_idx)
-        start_date = _format_date(_raw_cell(row, start_idx), tz_name)
+    positions = _matched_positions(sheet, surname, mode)
+    end = offset + page_size
+
+    for position in positions[offset:end]:
+        last_name = sheet.text(position, "last_name")
+        trip_id = sheet.text(position, "trip_id")
+        first_name = sheet.text(position, "first_name")
+        destination = sheet.text(position, "destination")
+        start_date = sheet.text(position, "start_date")
         if not destination:
             destination = "не указано"
         if not start_date:
@@ -126,31 +725,100 @@ def search_by_surname(surname: str) -> Dict[str, Any]:
             start_date=start_date,
         )
         text_messages.append(message)
-        if len(results) >= settings.max_search_results:
-            break
 
+    next_cursor = None
+    if end < len(positions):
+        next_cursor = encode_cursor(sheet.version, end, _normalize_surname(surname), mode)
     return {
         "status": "ok",
         "count": len(results),
+        "offset": offset,
+        "total": len(positions),
         "results": results,
         "textMessages": text_messages,
+        "next_cursor": next_cursor,
     }
 
 
+def _matched_positions(sheet: SheetData, surname: str, mode: str) -> Sequence[int]:
+    if mode == "exact" or not sheet.fuzzy_index:
+        return sheet.surname_index.get(_normalize_surname(surname), [])
+    memo_key = ("matches", _normalize_surname(surname), mode, sheet.version)
+    cached = results_cache.get(memo_key)
+    if cached is None:
+        cached = tuple(_match_positions(sheet, surname, mode))
+        results_cache.set(memo_key, cached)
+    return cached
+
+
+def _match_positions(sheet: SheetData, surname: str, mode: str) -> Iterable[int]:
+    if mode == "exact" or not sheet.fuzzy_index:
+        return sheet.surname_index.get(_normalize_surname(surname), [])
+    if mode == "prefix":
+        matched = sheet.fuzzy_index.prefix(surname)
+    else:
+        matched = sheet.fuzzy_index.fuzzy(surname)
+    return itertools.chain.from_iterable(sheet.surname_index.get(key, []) for key in matched)
+
+
 def get_trip(trip_id: str) -> Dict[str, Any]:
-    trip_id = trip_id.strip()
-    tz_name = _get_timezone()
+    return _get_trip(_load_trip_snapshot(), trip_id)
+
+
+def get_trip_batch(trip_ids: List[str]) -> Dict[str, Any]:
+    items = list(iter_get_trip_batch(trip_ids))
+    return {"status": "ok", "count": len(items), "items": items}
+
+
+def iter_get_trip_batch(trip_ids: List[str]) -> Iterator[Dict[str, Any]]:
+    snapshot = _load_trip_snapshot()
+    return (_get_trip_batch_item(snapshot, trip_id) for trip_id in trip_ids)
+
 
+def _get_trip_batch_item(snapshot: TripSnapshot, trip_id: str) -> Dict[str, Any]:
+    try:
+        result = _get_trip(snapshot, trip_id)
+    except LookupError as exc:
+        return {"key": trip_id, "status": "error", "error": str(exc)}
+    return {"key": trip_id, "status": "ok", "result": result}
+
+
+def _load_trip_snapshot() -> TripSnapshot:
+    tz_name = _get_timezone()
     trips_sheet = _load_sheet("Trips")
     profile_sheet = _load_sheet("Profile")
     contacts_sheet = _load_sheet("Contacts")
+    return TripSnapshot(
+        trips=trips_sheet,
+        profile=profile_sheet,
+        contacts=contacts_sheet,
+        timezone=tz_name,
+        index=_get_trip_index(trips_sheet, profile_sheet, contacts_sheet),
+    )
 
-    trip_row, trip_idx_map = _find_trip_row(trips_sheet, trip_id)
-    if not trip_row:
+
+def _get_trip(snapshot: TripSnapshot, trip_id: str) -> Dict[str, Any]:
+    trip_id = trip_id.strip()
+    memo_key = ("get_trip", trip_id, snapshot.index.source_versions, snapshot.timezone)
+    cached = results_cache.get(memo_key)
+    if cached is None:
+        cached = _build_trip(snapshot, trip_id)
+        results_cache.set(memo_key, cached)
+    meta = dict(cached["meta"])
+    meta["generated_at"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {**cached, "meta": meta}
+
+
+def _build_trip(snapshot: TripSnapshot, trip_id: str) -> Dict[str, Any]:
+    tz_name = snapshot.timezone
+    trips_sheet = snapshot.trips
+    index = snapshot.index
+    trip_positions = index.trips.get(trip_id)
+    if not trip_positions:
         raise LookupError("trip not found")
 
-    trips_data = _build_trip_data(trip_row, trips_sheet, tz_name)
-    clients = _build_clients(profile_sheet, contacts_sheet, trip_id)
+    trips_data = _build_trip_data(trips_sheet, trip_positions[0])
+    clients = _build_clients(snapshot.profile, snapshot.contacts, index, trip_id)
 
     payments = {
         "total": trips_data.get("total", ""),
@@ -166,7 +834,7 @@ def get_trip(trip_id: str) -> Dict[str, Any]:
 
     meta = {
         "trip_id": trip_id,
-        "generated_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "generated_at": "",
         "timezone": tz_name,
     }
 
@@ -178,84 +846,66 @@ def get_trip(trip_id: str) -> Dict[str, Any]:
     }
 
 
-def _find_trip_row(sheet: SheetData, trip_id: str) -> Tuple[Optional[List[Any]], Dict[str, int]]:
-    trip_idx = pick_header(sheet.header_map, ["trip_id", "trip id"])
-    for row in sheet.rows:
-        if _cell(row, trip_idx) == trip_id:
-            return row, sheet.header_map
-    return None, sheet.header_map
-
-
-def _build_trip_data(row: List[Any], sheet: SheetData, tz_name: str) -> Dict[str, Any]:
-    last_idx = pick_header(sheet.header_map, ["lastname", "last name"])
-    first_idx = pick_header(sheet.header_map, ["firstname", "first name"])
-    trip_idx = pick_header(sheet.header_map, ["trip_id", "trip id"])
-    start_idx = pick_header(sheet.header_map, ["startdate", "start date"])
-    dest_idx = pick_header(sheet.header_map, ["destination"])
-    total_idx = pick_header(sheet.header_map, ["total", "amount"])
-    currency_idx = pick_header(sheet.header_map, ["currency"])
-
-    start_date = _format_date(_raw_cell(row, start_idx), tz_name)
+def _build_trip_data(sheet: SheetData, position: int) -> Dict[str, Any]:
     return {
-        "trip_id": _cell(row, trip_idx),
+        "trip_id": sheet.text(position, "trip_id"),
         "main_tourist": {
-            "last_name": _cell(row, last_idx),
-            "first_name": _cell(row, first_idx),
+            "last_name": sheet.text(position, "last_name"),
+            "first_name": sheet.text(position, "first_name"),
         },
-        "destination": _cell(row, dest_idx),
-        "start_date": start_date,
+        "destination": sheet.text(position, "destination"),
+        "start_date": sheet.text(position, "start_date"),
         "passengers": [],
-        "total": _cell(row, total_idx),
-        "currency": _cell(row, currency_idx),
+        "total": sheet.text(position, "total"),
+        "currency": sheet.text(position, "currency"),
     }
 
 
-def _build_clients(profile_sheet: SheetData, contacts_sheet: SheetData, trip_id: str) -> List[Dict[str, Any]]:
-    profile_trip_idx = pick_header(profile_sheet.header_map, ["trip_id", "trip id"])
-    client_id_idx = pick_header(profile_sheet.header_map, ["client_id", "client id", "id"])
-    last_idx = pick_header(profile_sheet.header_map, ["lastname", "last name"])
-    first_idx = pick_header(profile_sheet.header_map, ["firstname", "first name"])
-    amount_idx = pick_header(profile_sheet.header_map, ["amount", "total"])
-
-    contacts_trip_idx = pick_header(contacts_sheet.header_map, ["trip_id", "trip id"])
-    contact_client_idx = pick_header(contacts_sheet.header_map, ["client_id", "client id", "id"])
-    phone_idx = pick_header(contacts_sheet.header_map, ["phone", "mobile"])
-    email_idx = pick_header(contacts_sheet.header_map, ["email"])
-
+def _build_clients(
+    profile_sheet: SheetData,
+    contacts_sheet: SheetData,
+    index: TripIndex,
+    trip_id: str,
+) -> List[Dict[str, Any]]:
+    trip_contacts = index.contacts.get(trip_id, {})
     clients: List[Dict[str, Any]] = []
-    for row in profile_sheet.rows:
-        if _cell(row, profile_trip_idx) != trip_id:
-            continue
-        client_id = _cell(row, client_id_idx)
+    for position in index.profiles.get(trip_id, []):
+        client_id = profile_sheet.text(position, "client_id")
         client = {
             "client_id": client_id,
-            "last_name": _cell(row, last_idx),
-            "first_name": _cell(row, first_idx),
-            "amount": _cell(row, amount_idx),
+            "last_name": profile_sheet.text(position, "last_name"),
+            "first_name": profile_sheet.text(position, "first_name"),
+            "amount": profile_sheet.text(position, "amount"),
             "contacts": [],
         }
-        for contact in contacts_sheet.rows:
-            if _cell(contact, contacts_trip_idx) != trip_id:
-                continue
-            if client_id and _cell(contact, contact_client_idx) not in ("", client_id):
-                continue
+        for contact_position in _client_contact_positions(trip_contacts, client_id):
             entry = {
-                "phone": _cell(contact, phone_idx),
-                "email": _cell(contact, email_idx),
+                "phone": contacts_sheet.text(contact_position, "phone"),
+                "email": contacts_sheet.text(contact_position, "email"),
             }
             client["contacts"].append(entry)
         clients.append(client)
     return clients
 
 
-def _cell(row: List[Any], idx: Optional[int]) -> str:
+def _client_contact_positions(trip_contacts: Dict[str, List[int]], client_id: str) -> List[int]:
+    if not client_id:
+        groups = list(trip_contacts.values())
+    else:
+        groups = [trip_contacts.get("", []), trip_contacts.get(client_id, [])]
+    if len(groups) == 1:
+        return groups[0]
+    return sorted(itertools.chain.from_iterable(groups))
+
+
+def _cell(row: Sequence[Any], idx: Optional[int]) -> str:
     value = _raw_cell(row, idx)
     if value is None:
         return ""
     return str(value).strip()
 
 
-def _raw_cell(row: List[Any], idx: Optional[int]) -> Any:
+def _raw_cell(row: Sequence[Any], idx: Optional[int]) -> Any:
     if idx is None:
         return ""
     if idx >= len(row):
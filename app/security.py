@@ -1,9 +1,24 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
 import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Optional
 
+from app import metrics
 from app.config import settings
 
+RATE_LIMITED = metrics.counter(
+    "crm_rate_limited_total",
+    "Requests rejected by the rate limiter, by source (api or tg).",
+    ("source",),
+)
+
 
 @dataclass
 class RateLimitState:
@@ -11,31 +26,142 @@ class RateLimitState:
     updated_at: float
 
 
+class RateLimitBackend(ABC):
+    @abstractmethod
+    def take(self, key: str, cost: float, capacity: float, refill_rate: float, now: float) -> bool:
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+
+def _refill(state: RateLimitState, capacity: float, refill_rate: float, now: float) -> None:
+    elapsed = now - state.updated_at
+    state.tokens = min(capacity, state.tokens + elapsed * refill_rate)
+    state.updated_at = now
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    def __init__(self, max_keys: int, idle_seconds: float) -> None:
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self._state: "OrderedDict[str, RateLimitState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, capacity: float, refill_rate: float, now: float) -> bool:
+        with self._lock:
+            state = self._state.get(key)
+            if not state:
+                state = RateLimitState(tokens=capacity, updated_at=now)
+                self._state[key] = state
+            else:
+                self._state.move_to_end(key)
+            _refill(state, capacity, refill_rate, now)
+            allowed = state.tokens >= cost
+            if allowed:
+                state.tokens -= cost
+            self._evict(now)
+            return allowed
+
+    def _evict(self, now: float) -> None:
+        while self._state:
+            oldest_key, oldest = next(iter(self._state.items()))
+            over_limit = self.max_keys and len(self._state) > self.max_keys
+            if not over_limit and now - oldest.updated_at < self.idle_seconds:
+                return
+            del self._state[oldest_key]
+
+    def size(self) -> int:
+        return len(self._state)
+
+
+class SharedMemoryRateLimitBackend(RateLimitBackend):
+    _SLOT = struct.Struct("<Qdd")
+    _PROBES = 8
+
+    def __init__(self, path: str, slots: int, idle_seconds: float) -> None:
+        self.slots = max(slots, self._PROBES)
+        self.idle_seconds = idle_seconds
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = self.slots * self._SLOT.size
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, capacity: float, refill_rate: float, now: float) -> bool:
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") | 1
+        first = key_hash % (self.slots - self._PROBES + 1)
+        start = first * self._SLOT.size
+        length = self._PROBES * self._SLOT.size
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, start)
+            try:
+                slot = self._find_slot(key_hash, first, now)
+                stored_hash, tokens, updated_at = self._SLOT.unpack_from(self._map, slot * self._SLOT.size)
+                if stored_hash != key_hash:
+                    state = RateLimitState(tokens=capacity, updated_at=now)
+                else:
+                    state = RateLimitState(tokens=tokens, updated_at=updated_at)
+                _refill(state, capacity, refill_rate, now)
+                allowed = state.tokens >= cost
+                if allowed:
+                    state.tokens -= cost
+                self._SLOT.pack_into(
+                    self._map, slot * self._SLOT.size, key_hash, state.tokens, state.updated_at
+                )
+                return allowed
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+    def _find_slot(self, key_hash: int, first: int, now: float) -> int:
+        oldest_slot = first
+        oldest_at = float("inf")
+        for slot in range(first, first + self._PROBES):
+            stored_hash, _, updated_at = self._SLOT.unpack_from(self._map, slot * self._SLOT.size)
+            if stored_hash == key_hash:
+                return slot
+            if stored_hash == 0 or now - updated_at >= self.idle_seconds:
+                updated_at = float("-inf")
+            if updated_at < oldest_at:
+                oldest_slot, oldest_at = slot, updated_at
+        return oldest_slot
+
+    def size(self) -> int:
+        used = 0
+        for slot in range(self.slots):
+            if self._SLOT.unpack_from(self._map, slot * self._SLOT.size)[0]:
+                used += 1
+        return used
+
+
 class RateLimiter:
-    def __init__(self, rate_per_min: int) -> None:
+    def __init__(self, rate_per_min: int, backend: Optional[RateLimitBackend] = None) -> None:
         self.rate_per_min = rate_per_min
-        self._state: Dict[str, RateLimitState] = {}
+        self.backend = backend or create_rate_limit_backend()
 
-    def allow(self, key: str) -> bool:
+    def allow(self, key: str, cost: float = 1.0) -> bool:
         if self.rate_per_min <= 0:
             return True
-        now = time.time()
-        state = self._state.get(key)
         capacity = float(self.rate_per_min)
-        refill_rate = capacity / 60.0
-        if not state:
-            state = RateLimitState(tokens=capacity, updated_at=now)
-            self._state[key] = state
-        elapsed = now - state.updated_at
-        state.tokens = min(capacity, state.tokens + elapsed * refill_rate)
-        state.updated_at = now
-        if state.tokens < 1.0:
-            return False
-        state.tokens -= 1.0
-        return True
-
-
-rate_limiter = RateLimiter(settings.rate_limit_per_min)
+        allowed = self.backend.take(key, cost, capacity, capacity / 60.0, time.time())
+        if not allowed:
+            RATE_LIMITED.inc(source=key.split(":", 1)[0])
+        return allowed
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == "shared":
+        return SharedMemoryRateLimitBackend(
+            settings.rate_limit_shared_path,
+            settings.rate_limit_max_keys,
+            settings.rate_limit_idle_seconds,
+        )
+    return MemoryRateLimitBackend(settings.rate_limit_max_keys, settings.rate_limit_idle_seconds)
+
+
+rate_limiter = RateLimiter(settings.rate_limit_per_min, create_rate_limit_backend())
 
 
 def is_allowed_user(user_id: Optional[str]) -> bool:
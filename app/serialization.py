@@ -0,0 +1,24 @@
+import json
+from typing import Any, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def ndjson_chunk(items: Iterator[Any], limit: int) -> bytes:
+    lines = []
+    for item in items:
+        lines.append(dumps(item))
+        if len(lines) >= limit:
+            break
+    if not lines:
+        return b""
+    return b"\n".join(lines) + b"\n"
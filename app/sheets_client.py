@@ -1,45 +1,145 @@
 import json
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from app import metrics
 from app.config import settings
 
 READONLY_SCOPE = "https://www.googleapis.com/auth/spreadsheets.readonly"
 
+SHEETS_REQUESTS = metrics.histogram(
+    "crm_sheets_request_duration_seconds",
+    "Google Sheets API call latency by method, sheet and outcome.",
+    ("method", "sheet", "status"),
+)
+
+
+def _execute(request: Any, method: str, sheet: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        return request.execute()
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        SHEETS_REQUESTS.observe(time.perf_counter() - started, method=method, sheet=sheet, status=status)
+
 
 class SheetsClient:
     def __init__(self, spreadsheet_id: str, service_account_json: str) -> None:
         self.spreadsheet_id = spreadsheet_id
         self.service_account_json = service_account_json
         self._service = None
+        self._service_lock = threading.Lock()
 
     def _get_service(self):
         if self._service:
             return self._service
-        if not self.service_account_json:
-            raise RuntimeError("service account json missing")
-        from google.oauth2.service_account import Credentials
-        from googleapiclient.discovery import build
-        info = json.loads(self.service_account_json)
-        creds = Credentials.from_service_account_info(info, scopes=[READONLY_SCOPE])
-        self._service = build("sheets", "v4", credentials=creds, cache_discovery=False)
-        return self._service
+        with self._service_lock:
+            if self._service:
+                return self._service
+            if not self.service_account_json:
+                raise RuntimeError("service account json missing")
+            from google.oauth2.service_account import Credentials
+            from googleapiclient.discovery import build
+            info = json.loads(self.service_account_json)
+            creds = Credentials.from_service_account_info(info, scopes=[READONLY_SCOPE])
+            self._service = build("sheets", "v4", credentials=creds, cache_discovery=False, static_discovery=True)
+            return self._service
+
+    def warm_up(self) -> None:
+        self._get_service()
 
     def get_timezone(self) -> str:
         service = self._get_service()
-        spreadsheet = service.spreadsheets().get(spreadsheetId=self.spreadsheet_id).execute()
+        spreadsheet = _execute(
+            service.spreadsheets().get(spreadsheetId=self.spreadsheet_id, fields="properties.timeZone"),
+            "get",
+            "properties",
+        )
         props = spreadsheet.get("properties", {})
         return props.get("timeZone", "UTC")
 
     def read_sheet(self, sheet_name: str) -> List[List[Any]]:
+        return self.read_sheets([sheet_name])[sheet_name]
+
+    def read_sheets(self, sheet_names: Sequence[str]) -> Dict[str, List[List[Any]]]:
+        from app.schema import projected_columns
+
+        header_rows = self._batch_get([f"{_quote(name)}!1:1" for name in sheet_names], "headers", sheet_names)
+        last_row = settings.max_sheet_rows + 1
+        ranges: List[str] = []
+        layouts: Dict[str, Optional[List[Tuple[int, int]]]] = {}
+        for sheet_name, header_values in zip(sheet_names, header_rows):
+            header = header_values[0] if header_values else []
+            columns = projected_columns(sheet_name, header)
+            if columns is None:
+                layouts[sheet_name] = None
+                ranges.append(f"{_quote(sheet_name)}!1:{last_row}")
+                continue
+            runs = _column_runs(columns)
+            layouts[sheet_name] = runs
+            for start, end in runs:
+                ranges.append(f"{_quote(sheet_name)}!{_column_letter(start)}1:{_column_letter(end)}{last_row}")
+        value_ranges = iter(self._batch_get(ranges, "values.batchGet", sheet_names)) if ranges else iter(())
+        sheets: Dict[str, List[List[Any]]] = {}
+        for sheet_name in sheet_names:
+            runs = layouts[sheet_name]
+            if runs is None:
+                sheets[sheet_name] = next(value_ranges)
+            else:
+                sheets[sheet_name] = _merge_runs([next(value_ranges) for _ in runs], runs)
+        return sheets
+
+    def _batch_get(self, ranges: List[str], method: str, sheet_names: Sequence[str]) -> List[List[List[Any]]]:
         service = self._get_service()
-        result = (
+        result = _execute(
             service.spreadsheets()
             .values()
-            .get(spreadsheetId=self.spreadsheet_id, range=sheet_name)
-            .execute()
+            .batchGet(spreadsheetId=self.spreadsheet_id, ranges=ranges, valueRenderOption="UNFORMATTED_VALUE"),
+            method,
+            ",".join(sheet_names),
         )
-        values = result.get("values", [])
-        return values
+        return [value_range.get("values", []) for value_range in result.get("valueRanges", [])]
+
+
+def _quote(sheet_name: str) -> str:
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _column_runs(columns: List[int]) -> List[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    for column in columns:
+        if runs and runs[-1][1] == column - 1:
+            runs[-1] = (runs[-1][0], column)
+        else:
+            runs.append((column, column))
+    return runs
+
+
+def _merge_runs(run_values: List[List[List[Any]]], runs: List[Tuple[int, int]]) -> List[List[Any]]:
+    widths = [end - start + 1 for start, end in runs]
+    row_count = max((len(values) for values in run_values), default=0)
+    rows: List[List[Any]] = []
+    for position in range(row_count):
+        row: List[Any] = []
+        for values, width in zip(run_values, widths):
+            cells = values[position] if position < len(values) else []
+            row.extend(cells)
+            row.extend([""] * (width - len(cells)))
+        rows.append(row)
+    return rows
 
 
 sheets_client = SheetsClient(settings.spreadsheet_id, settings.google_service_account_json)
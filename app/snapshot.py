@@ -0,0 +1,37 @@
+import mmap
+import os
+import pickle
+import struct
+import time
+from typing import Any, Optional
+
+SNAPSHOT_MAGIC = b"CRMSNAP\x00"
+SNAPSHOT_FORMAT = 1
+_HEADER = struct.Struct("<8sHId")
+
+
+def save_snapshot(path: str, schema: int, payload: Any) -> None:
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, schema, time.time())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(header)
+        pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, schema: int, max_age: float) -> Optional[Any]:
+    try:
+        handle = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with handle:
+        if os.fstat(handle.fileno()).st_size <= _HEADER.size:
+            return None
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, file_format, file_schema, created_at = _HEADER.unpack_from(mapped)
+            if magic != SNAPSHOT_MAGIC or file_format != SNAPSHOT_FORMAT or file_schema != schema:
+                return None
+            if time.time() - created_at > max_age:
+                return None
+            with memoryview(mapped) as view, view[_HEADER.size:] as body:
+                return pickle.loads(body)
@@ -0,0 +1,65 @@
+import asyncio
+import hmac
+from dataclasses import dataclass
+from typing import Any, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from fastapi import APIRouter, HTTPException, Request
+
+from app.config import settings
+from app.logging_setup import get_logger
+
+WEBHOOK_PATH = "/telegram/webhook"
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+router = APIRouter()
+logger = get_logger("webhook")
+_pending: Set[asyncio.Task] = set()
+
+
+@dataclass
+class TelegramWebhook:
+    bot: Bot
+    dispatcher: Dispatcher
+
+
+async def start_webhook(bot: Bot, dispatcher: Dispatcher) -> TelegramWebhook:
+    if not settings.telegram_webhook_secret:
+        raise RuntimeError("telegram webhook secret missing")
+    if settings.telegram_webhook_url:
+        await bot.set_webhook(
+            settings.telegram_webhook_url.rstrip("/") + WEBHOOK_PATH,
+            secret_token=settings.telegram_webhook_secret,
+        )
+    return TelegramWebhook(bot=bot, dispatcher=dispatcher)
+
+
+async def stop_webhook(webhook: TelegramWebhook) -> None:
+    for task in list(_pending):
+        task.cancel()
+    await webhook.bot.session.close()
+
+
+@router.post(WEBHOOK_PATH)
+async def telegram_webhook(request: Request):
+    webhook = getattr(request.app.state, "telegram_webhook", None)
+    if webhook is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    secret = request.headers.get(SECRET_HEADER, "")
+    if not hmac.compare_digest(secret.encode("utf-8"), settings.telegram_webhook_secret.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    try:
+        update = Update.model_validate(await request.json(), context={"bot": webhook.bot})
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="invalid update") from exc
+    task = asyncio.create_task(webhook.dispatcher.feed_update(webhook.bot, update))
+    _pending.add(task)
+    task.add_done_callback(_finish)
+    return {"ok": True}
+
+
+def _finish(task: "asyncio.Task[Any]") -> None:
+    _pending.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("update status=error error=%s", type(task.exception()).__name__)
@@ -0,0 +1,109 @@
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+SIZES = (1_000, 10_000, 50_000)
+
+_SURNAMES = (
+    "Иванов", "Иванова", "Петров", "Петрова", "Сидоров", "Смирнов", "Смирнова", "Кузнецов",
+    "Попов", "Попова", "Васильев", "Соколов", "Михайлов", "Новиков", "Фёдоров", "Морозов",
+    "Волков", "Алексеев", "Лебедев", "Семёнов", "Егоров", "Павлов", "Козлов", "Степанов",
+    "Ivanov", "Petrov", "Smirnov", "Kuznetsov", "Popov", "Sokolov", "Müller", "Schmidt",
+)
+_FIRST_NAMES = ("Иван", "Мария", "Алексей", "Анна", "Дмитрий", "Елена", "Сергей", "Ольга", "Ivan", "Anna")
+_DESTINATIONS = ("Турция", "Египет", "ОАЭ", "Таиланд", "Грузия", "Paris", "Rome", "", "Бали")
+_CURRENCIES = ("RUB", "USD", "EUR", "")
+
+_HEADER_VARIANTS = {
+    "trip_id": ("Trip ID", "Trip_ID", " trip id ", "TRIP_ID"),
+    "last_name": ("Last Name", "LastName", " last  name", "LAST_NAME"),
+    "first_name": ("First Name", "FirstName", "first_name "),
+    "start_date": ("Start Date", "StartDate", "start_date"),
+    "destination": ("Destination", " destination", "DESTINATION"),
+    "total": ("Total", "Amount"),
+    "currency": ("Currency", "currency "),
+    "client_id": ("Client ID", "Client_ID", "id"),
+    "amount": ("Amount", "Total"),
+    "phone": ("Phone", "Mobile"),
+    "email": ("Email", "EMAIL "),
+}
+_EXTRA_HEADERS = ("Manager", "Notes", "Created At", "Source", "Комментарий", "Status")
+
+
+def _header(rng: random.Random, field: str) -> str:
+    return rng.choice(_HEADER_VARIANTS[field])
+
+
+def _start_date(rng: random.Random) -> Any:
+    day = date(2023, 1, 1) + timedelta(days=rng.randrange(900))
+    serial = (day - date(1899, 12, 30)).days
+    kind = rng.randrange(8)
+    if kind == 0:
+        return serial
+    if kind == 1:
+        return serial + rng.choice((0.25, 0.5, 0.75))
+    if kind == 2:
+        return day.strftime("%Y-%m-%d")
+    if kind == 3:
+        return day.strftime("%d.%m.%Y")
+    if kind == 4:
+        return day.strftime(" %d/%m/%Y ")
+    if kind == 5:
+        return ""
+    if kind == 6:
+        return "уточняется"
+    return day.isoformat()
+
+
+def _extras(rng: random.Random) -> List[str]:
+    return [rng.choice(("", "да", "нет", "проверить", str(rng.randrange(1000)))) for _ in _EXTRA_HEADERS]
+
+
+def generate_sheets(rows: int, seed: int = 42) -> Dict[str, List[List[Any]]]:
+    rng = random.Random(seed)
+    trip_ids = [f"TR{100000 + index}" for index in range(rows)]
+
+    trips: List[List[Any]] = [
+        [_header(rng, "trip_id"), _header(rng, "last_name"), _header(rng, "first_name"), _header(rng, "start_date")]
+        + [_header(rng, "destination"), "Total", _header(rng, "currency")]
+        + list(_EXTRA_HEADERS)
+    ]
+    for trip_id in trip_ids:
+        trips.append(
+            [
+                trip_id,
+                rng.choice(_SURNAMES) + rng.choice(("", "", " ")),
+                rng.choice(_FIRST_NAMES),
+                _start_date(rng),
+                rng.choice(_DESTINATIONS),
+                rng.choice((rng.randrange(20_000, 900_000), f"{rng.randrange(200, 9000)}.00", "")),
+                rng.choice(_CURRENCIES),
+            ]
+            + _extras(rng)
+        )
+
+    profile: List[List[Any]] = [
+        [_header(rng, "trip_id"), "Client ID", _header(rng, "last_name"), _header(rng, "first_name"), "Amount", "Notes"]
+    ]
+    clients: List[List[str]] = []
+    for index in range(rows):
+        trip_id = rng.choice(trip_ids)
+        client_id = f"C{index}"
+        clients.append([trip_id, client_id])
+        profile.append(
+            [trip_id, client_id, rng.choice(_SURNAMES), rng.choice(_FIRST_NAMES), rng.randrange(10_000, 300_000), ""]
+        )
+
+    contacts: List[List[Any]] = [[_header(rng, "trip_id"), "Client ID", _header(rng, "phone"), _header(rng, "email")]]
+    for _ in range(rows):
+        trip_id, client_id = rng.choice(clients)
+        contacts.append(
+            [
+                trip_id,
+                rng.choice((client_id, client_id, "")),
+                f"+7 9{rng.randrange(10**8, 10**9)}",
+                rng.choice(("", f"user{rng.randrange(10**6)}@example.com")),
+            ]
+        )
+
+    return {"Trips": trips, "Profile": profile, "Contacts": contacts}
@@ -0,0 +1,249 @@
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from app import search, serialization
+from app.sheets_client import get_header_map
+from benchmarks.generator import SIZES, generate_sheets
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 2.0
+CALIBRATION_CASE = "calibration"
+# Differences below these are timer and allocator noise, not regressions;
+# the time floor is a share of the calibration case, so it scales with the machine.
+MIN_DELTA = {"ms": 0.02, "peak_kb": 16.0}
+# Reported for comparison only: times the stdlib encoder, not code in this repo.
+REPORT_ONLY = ("json_stdlib_500_trips",)
+
+Case = Tuple[Callable[[], Any], Callable[[], Any]]
+
+
+class BenchmarkClient:
+    def __init__(self, sheets: Dict[str, List[List[Any]]]) -> None:
+        self.sheets = sheets
+
+    def read_sheet(self, name: str) -> List[List[Any]]:
+        return self.sheets.get(name, [])
+
+    def read_sheets(self, names: List[str]) -> Dict[str, List[List[Any]]]:
+        return {name: self.sheets.get(name, []) for name in names}
+
+    def get_timezone(self) -> str:
+        return "Europe/Moscow"
+
+
+def _noop() -> None:
+    return None
+
+
+def _calibration() -> None:
+    # Fixed pure-Python workload measured in every run; timings are stored relative to it,
+    # so a faster or slower machine scales the baseline instead of tripping the gate.
+    values = [str(number * 7919 % 100003) for number in range(20000)]
+    groups: Dict[str, List[str]] = {}
+    for value in values:
+        groups.setdefault(value[:2], []).append(value.lower())
+    sorted(values)
+
+
+def _cold_cache() -> None:
+    search.cache.clear()
+    search.results_cache.clear()
+
+
+def _cycle(values: List[Any]) -> Callable[[], Any]:
+    state = {"position": 0}
+
+    def take() -> Any:
+        value = values[state["position"] % len(values)]
+        state["position"] += 1
+        return value
+
+    return take
+
+
+def _cases(sheets: Dict[str, List[List[Any]]]) -> Dict[str, Case]:
+    trips = sheets["Trips"]
+    surnames = sorted({str(row[1]).strip() for row in trips[1:]})
+    trip_ids = [row[0] for row in trips[1 : len(trips) : max(1, len(trips) // 200)]]
+    dates = [row[3] for row in trips[1:2001]]
+    next_surname = _cycle(surnames)
+    next_typo = _cycle([surname[:-1] + "a" for surname in surnames])
+    next_prefix = _cycle([surname[:3] for surname in surnames])
+    next_trip = _cycle(trip_ids)
+
+    batch_ids = [row[0] for row in trips[1:501]]
+    payload = search.get_trip_batch(batch_ids)
+
+    def stdlib_json() -> bytes:
+        # Same settings as starlette's JSONResponse.render.
+        return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def build_and_dump() -> bytes:
+        return serialization.dumps(search.get_trip_batch(batch_ids))
+
+    def ndjson_first_chunk() -> bytes:
+        return serialization.ndjson_chunk(search.iter_get_trip_batch(batch_ids), 50)
+
+    def ndjson_all_chunks() -> None:
+        items = search.iter_get_trip_batch(batch_ids)
+        for _ in iter(lambda: serialization.ndjson_chunk(items, 50), b""):
+            pass
+
+    def normalize_dates() -> None:
+        for value in dates:
+            search._normalize_date.__wrapped__(value)
+
+    return {
+        "get_header_map": (_noop, lambda: get_header_map(trips)),
+        "load_sheet_trips": (_cold_cache, lambda: search._load_sheet("Trips")),
+        "refresh_sheets": (_cold_cache, search.refresh_sheets),
+        "search_exact": (search.results_cache.clear, lambda: search.search_by_surname(next_surname())),
+        "search_prefix": (search.results_cache.clear, lambda: search.search_by_surname(next_prefix(), "prefix")),
+        "search_fuzzy": (search.results_cache.clear, lambda: search.search_by_surname(next_typo(), "fuzzy")),
+        "search_memoized": (_noop, lambda: search.search_by_surname(surnames[0])),
+        "get_trip": (search.results_cache.clear, lambda: search.get_trip(next_trip())),
+        "get_trip_memoized": (_noop, lambda: search.get_trip(trip_ids[0])),
+        "normalize_date_x2000": (_noop, normalize_dates),
+        "trip_batch500_build_and_json": (search.results_cache.clear, build_and_dump),
+        "trip_batch500_ndjson_first": (search.results_cache.clear, ndjson_first_chunk),
+        "trip_batch500_ndjson_all": (search.results_cache.clear, ndjson_all_chunks),
+        "json_stdlib_500_trips": (_noop, stdlib_json),
+        "json_fast_500_trips": (_noop, lambda: serialization.dumps(payload)),
+    }
+
+
+def _measure(setup: Callable[[], Any], func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    setup()
+    func()
+    timings = []
+    for _ in range(repeat):
+        setup()
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            gc.enable()
+    setup()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The fastest run is the one least disturbed by the rest of the machine.
+    return {"ms": round(min(timings), 4), "peak_kb": round(peak / 1024, 1)}
+
+
+def run(sizes: List[int], seed: int, repeat: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    original_client = search.sheets_client
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    try:
+        for size in sizes:
+            sheets = generate_sheets(size, seed)
+            search.sheets_client = BenchmarkClient(sheets)
+            _cold_cache()
+            search.refresh_sheets()
+            calibration = _measure(_noop, _calibration, repeat)
+            results[str(size)] = {CALIBRATION_CASE: {**calibration, "rel": 1.0}}
+            for name, (setup, func) in _cases(sheets).items():
+                if setup is _cold_cache:
+                    repeat_for_case = max(5, repeat // 5)
+                else:
+                    repeat_for_case = repeat
+                measured = _measure(setup, func, repeat_for_case)
+                measured["rel"] = round(measured["ms"] / calibration["ms"], 4)
+                results[str(size)][name] = measured
+                if setup is _cold_cache:
+                    search.refresh_sheets()
+    finally:
+        search.sheets_client = original_client
+        _cold_cache()
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    threshold: float,
+) -> List[str]:
+    regressions = []
+    for size, cases in results.items():
+        calibration_ms = cases[CALIBRATION_CASE]["ms"]
+        for name, current in cases.items():
+            previous = baseline.get(size, {}).get(name)
+            if not previous or name == CALIBRATION_CASE or name in REPORT_ONLY:
+                continue
+            expected = _expected(previous, calibration_ms)
+            floors = {"ms": MIN_DELTA["ms"] * calibration_ms, "peak_kb": MIN_DELTA["peak_kb"]}
+            for metric, floor in floors.items():
+                limit = expected[metric] * threshold
+                if current[metric] > limit and current[metric] - expected[metric] > floor:
+                    regressions.append(
+                        f"size={size} case={name} {metric}={current[metric]} expected={expected[metric]}"
+                    )
+    return regressions
+
+
+def _expected(previous: Dict[str, float], calibration_ms: float) -> Dict[str, float]:
+    return {"ms": round(previous["rel"] * calibration_ms, 4), "peak_kb": previous["peak_kb"]}
+
+
+def _print_table(results: Dict[str, Dict[str, Dict[str, float]]], baseline: Dict[str, Any]) -> None:
+    print(f"{'size':>7} {'case':<20} {'ms':>10} {'expect ms':>10} {'rel':>10} {'peak kb':>10} {'base kb':>10}")
+    for size, cases in results.items():
+        calibration_ms = cases[CALIBRATION_CASE]["ms"]
+        for name, current in cases.items():
+            previous = baseline.get(size, {}).get(name)
+            expected = _expected(previous, calibration_ms) if previous else {"ms": float("nan"), "peak_kb": float("nan")}
+            print(
+                f"{size:>7} {name:<20} {current['ms']:>10.4f} {expected['ms']:>10.4f} {current['rel']:>10.4f}"
+                f" {current['peak_kb']:>10.1f} {expected['peak_kb']:>10.1f}"
+            )
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for sheet loading, search and get_trip.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    stored: Dict[str, Any] = {}
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+    threshold = args.threshold or stored.get("threshold", DEFAULT_THRESHOLD)
+    # Baselines recorded before calibration hold absolute timings and cannot be rescaled.
+    baseline = {size: cases for size, cases in stored.get("results", {}).items() if CALIBRATION_CASE in cases}
+
+    results = run(sizes, args.seed, args.repeat)
+    _print_table(results, baseline)
+
+    if args.update_baseline:
+        merged = {**baseline, **results}
+        payload = {"seed": args.seed, "threshold": threshold, "python": sys.version.split()[0], "results": merged}
+        args.baseline.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline written: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
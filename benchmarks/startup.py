@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_IMPORT_MAIN = """
+import time
+started = time.perf_counter()
+import app.main
+print(time.perf_counter() - started)
+"""
+
+_BUILD_SERVICE = """
+import time
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build
+started = time.perf_counter()
+build("sheets", "v4", credentials=AnonymousCredentials(), cache_discovery=False, static_discovery=True)
+print(time.perf_counter() - started)
+"""
+
+_FIRST_SEARCH = """
+import time
+started = time.perf_counter()
+from app import search
+from benchmarks.generator import generate_sheets
+from benchmarks.run import BenchmarkClient
+imported = time.perf_counter()
+search.sheets_client = BenchmarkClient(generate_sheets(10_000))
+generated = time.perf_counter()
+search.search_by_surname("Иванов")
+print((imported - started) + (time.perf_counter() - generated))
+"""
+
+CASES = {
+    "import_app_main": (_IMPORT_MAIN, {"TELEGRAM_BOT_TOKEN": ""}),
+    "import_app_main_with_bot": (_IMPORT_MAIN, {"TELEGRAM_BOT_TOKEN": "42:TEST", "BOT_MODE": "webhook"}),
+    "build_sheets_service": (_BUILD_SERVICE, {}),
+    "first_search_10k": (_FIRST_SEARCH, {}),
+}
+
+
+def _run_case(code: str, env: Dict[str, str]) -> Optional[float]:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT), "LOG_LEVEL": "ERROR", **env},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int) -> Dict[str, Optional[float]]:
+    results: Dict[str, Optional[float]] = {}
+    for name, (code, env) in CASES.items():
+        timings: List[float] = []
+        for _ in range(repeat):
+            elapsed = _run_case(code, env)
+            if elapsed is None:
+                break
+            timings.append(elapsed * 1000)
+        results[name] = round(statistics.median(timings), 1) if timings else None
+    return results
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Cold start timings, each measured in a fresh interpreter.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for name, value in results.items():
+        print(f"{name:<26} {'unavailable' if value is None else f'{value:.1f} ms'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,4 +1,14 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-exec uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
+case "${PROCESS_ROLE:-all}" in
+  loader)
+    exec python -m app.loader
+    ;;
+  bot)
+    exec python -m app.bot
+    ;;
+  *)
+    exec uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000} --workers ${WEB_CONCURRENCY:-1}
+    ;;
+esac
@@ -0,0 +1,77 @@
+import dataclasses
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import api
+from app.pagination import InvalidQueryError
+from app.security import RateLimiter
+
+
+def _client(monkeypatch, **overrides):
+    settings = dataclasses.replace(api.settings, api_key="key", allowed_user_ids=["1"], **overrides)
+    monkeypatch.setattr("app.api.settings", settings)
+    monkeypatch.setattr("app.security.settings", settings)
+    monkeypatch.setattr("app.api.rate_limiter", RateLimiter(settings.rate_limit_per_min))
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def test_batch_larger_than_rate_bucket_is_rejected_up_front(monkeypatch):
+    client = _client(monkeypatch, rate_limit_per_min=20, batch_items_per_token=10, max_batch_size=500)
+    response = client.post(
+        "/api",
+        json={"action": "get_trip_batch", "trip_ids": [f"T{i}" for i in range(300)]},
+        headers={"x-api-key": "key", "x-user-id": "1"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "batch too large, at most 200 keys"
+
+
+def test_largest_allowed_batch_fits_the_rate_bucket(monkeypatch):
+    client = _client(monkeypatch, rate_limit_per_min=20, batch_items_per_token=10, max_batch_size=500)
+    monkeypatch.setattr("app.api.get_trip_batch", lambda keys: {"status": "ok", "count": len(keys), "items": []})
+    response = client.post(
+        "/api",
+        json={"action": "get_trip_batch", "trip_ids": [f"T{i}" for i in range(200)]},
+        headers={"x-api-key": "key", "x-user-id": "1"},
+    )
+    assert response.status_code == 200
+
+
+def _raise(exc):
+    def call(*args):
+        raise exc
+
+    return call
+
+
+def test_invalid_cursor_is_a_client_error(monkeypatch):
+    client = _client(monkeypatch)
+    monkeypatch.setattr("app.api.search_by_surname", _raise(InvalidQueryError("invalid cursor")))
+    response = client.post(
+        "/api",
+        json={"action": "search", "surname": "Ivanov", "cursor": "junk"},
+        headers={"x-api-key": "key", "x-user-id": "1"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "invalid cursor"
+
+
+def test_server_side_value_error_stays_internal(monkeypatch):
+    client = _client(monkeypatch)
+    error = ValueError("Service account info was not in the expected format")
+    monkeypatch.setattr("app.api.search_by_surname", _raise(error))
+    response = client.post(
+        "/api",
+        json={"action": "search", "surname": "Ivanov"},
+        headers={"x-api-key": "key", "x-user-id": "1"},
+    )
+    assert response.status_code == 500
+    assert response.json()["detail"] == "internal error"
@@ -0,0 +1,55 @@
+from benchmarks.generator import generate_sheets
+from benchmarks.run import compare, run
+
+
+def test_generator_is_seeded():
+    assert generate_sheets(50, seed=7) == generate_sheets(50, seed=7)
+    assert generate_sheets(50, seed=7) != generate_sheets(50, seed=8)
+    sheets = generate_sheets(50)
+    assert {name: len(rows) for name, rows in sheets.items()} == {"Trips": 51, "Profile": 51, "Contacts": 51}
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {
+        "1000": {
+            "calibration": {"ms": 10.0, "rel": 1.0, "peak_kb": 1.0},
+            "search_exact": {"ms": 1.0, "rel": 0.1, "peak_kb": 100.0},
+            "get_trip": {"ms": 0.1, "rel": 0.01, "peak_kb": 5.0},
+            "json_stdlib_500_trips": {"ms": 1.0, "rel": 0.1, "peak_kb": 100.0},
+        }
+    }
+    results = {
+        "1000": {
+            "calibration": {"ms": 10.0, "rel": 1.0, "peak_kb": 1.0},
+            "search_exact": {"ms": 2.0, "rel": 0.2, "peak_kb": 110.0},
+            "get_trip": {"ms": 0.3, "rel": 0.03, "peak_kb": 9.0},
+            "json_stdlib_500_trips": {"ms": 5.0, "rel": 0.5, "peak_kb": 500.0},
+        }
+    }
+    assert compare(results, baseline, 1.5) == ["size=1000 case=search_exact ms=2.0 expected=1.0"]
+
+
+def test_compare_scales_baseline_to_a_slower_machine():
+    baseline = {
+        "1000": {
+            "calibration": {"ms": 10.0, "rel": 1.0, "peak_kb": 1.0},
+            "search_exact": {"ms": 1.0, "rel": 0.1, "peak_kb": 100.0},
+            "search_fuzzy": {"ms": 1.0, "rel": 0.1, "peak_kb": 100.0},
+        }
+    }
+    results = {
+        "1000": {
+            "calibration": {"ms": 30.0, "rel": 1.0, "peak_kb": 1.0},
+            "search_exact": {"ms": 3.2, "rel": 0.1067, "peak_kb": 100.0},
+            "search_fuzzy": {"ms": 6.0, "rel": 0.2, "peak_kb": 100.0},
+        }
+    }
+    assert compare(results, baseline, 1.5) == ["size=1000 case=search_fuzzy ms=6.0 expected=3.0"]
+
+
+def test_run_produces_numbers_for_every_case():
+    results = run([200], seed=1, repeat=2)
+    assert set(results["200"]) >= {"load_sheet_trips", "search_exact", "search_fuzzy", "get_trip"}
+    assert all(case["ms"] >= 0 for case in results["200"].values())
+    assert results["200"]["calibration"]["rel"] == 1.0
+    assert results["200"]["search_exact"]["rel"] > 0
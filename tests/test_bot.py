@@ -0,0 +1,56 @@
+import asyncio
+import dataclasses
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from app import bot as bot_module
+from app.search import cache, results_cache
+
+from tests.test_pagination import MutableClient, _sheets
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        self.sent.append((text, reply_markup))
+
+
+class FakeCallback:
+    def __init__(self, bot, data):
+        self.bot = bot
+        self.data = data
+        self.from_user = SimpleNamespace(id=1)
+        self.message = SimpleNamespace(chat=SimpleNamespace(id=1))
+        self.answers = []
+
+    async def answer(self, text=None, show_alert=False):
+        self.answers.append(text)
+
+
+def test_more_button_is_served_from_callback_data_alone(monkeypatch):
+    import app.search as search
+
+    cache.clear()
+    results_cache.clear()
+    monkeypatch.setattr("app.search.settings", dataclasses.replace(search.settings, max_search_results=4))
+    monkeypatch.setattr("app.search.sheets_client", MutableClient(_sheets(20)))
+    monkeypatch.setattr("app.bot.is_allowed_user", lambda user_id: True)
+    fake_bot = FakeBot()
+
+    first = search.search_by_surname("Ivanov")
+    asyncio.run(bot_module._answer_search_page(fake_bot, 1, "Ivanov", "exact", first))
+    markup = fake_bot.sent[-1][1]
+    data = markup.inline_keyboard[0][0].callback_data
+
+    callback = FakeCallback(fake_bot, data)
+    asyncio.run(bot_module.handle_more(callback))
+    text, next_markup = fake_bot.sent[-1]
+    assert "Показано 8 из 10." in text
+    assert "Номер заказа: T9\n" in text and "Номер заказа: T15\n" in text
+    assert next_markup is not None
+    assert callback.answers == [None]
@@ -0,0 +1,63 @@
+from app.cache import TTLCache
+
+
+def test_stale_entry_served_until_max_staleness(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.cache.time.time", lambda: now[0])
+    cache = TTLCache(ttl_seconds=10, max_stale_seconds=20)
+    cache.set("key", "value")
+
+    now[0] += 15
+    assert cache.get("key") is None
+    assert cache.get_stale("key") == "value"
+
+    now[0] += 20
+    assert cache.get_stale("key") is None
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = TTLCache(ttl_seconds=60, max_entries=2, sizeof=len)
+    cache.set("a", "x")
+    cache.set("b", "x")
+    cache.get("a")
+    cache.set("c", "x")
+    assert cache.get("b") is None
+    assert cache.get("a") == "x"
+
+    sized = TTLCache(ttl_seconds=60, max_bytes=10, sizeof=len)
+    sized.set("a", "12345")
+    sized.set("b", "12345")
+    sized.set("c", "123")
+    assert sized.get("a") is None
+    assert sized.stats()["bytes"] == 8
+    assert sized.stats()["evictions"] == 1
+
+
+def test_sweep_drops_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.cache.time.time", lambda: now[0])
+    cache = TTLCache(ttl_seconds=20, sweep_interval=30)
+    cache.set("old", 1)
+    now[0] += 25
+    cache.set("new", 2)
+    assert cache.stats()["entries"] == 2
+    now[0] += 10
+    cache.get("new")
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_lookup_counts_once_and_peek_not_at_all(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.cache.time.time", lambda: now[0])
+    cache = TTLCache(ttl_seconds=10, max_stale_seconds=20)
+    assert cache.lookup("key") == (None, "miss")
+    cache.set("key", "value")
+    assert cache.lookup("key") == ("value", "fresh")
+    now[0] += 15
+    assert cache.lookup("key") == ("value", "stale")
+    assert cache.peek("key") is None
+    assert cache.peek("key", allow_stale=True) == "value"
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (1, 1, 1)
@@ -0,0 +1,15 @@
+import asyncio
+import threading
+
+from app.executor import run_blocking, shutdown_executor
+
+
+def test_run_blocking_uses_worker_thread():
+    async def main():
+        return await run_blocking(lambda: threading.current_thread().name)
+
+    try:
+        name = asyncio.run(main())
+    finally:
+        shutdown_executor()
+    assert name.startswith("sheets")
@@ -0,0 +1,47 @@
+import pytest
+
+from app.fuzzy import FuzzySurnameIndex, transliterate
+from app.pagination import InvalidQueryError
+from app.search import cache, search_by_surname
+
+
+class DummyClient:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def read_sheet(self, name):
+        return self.sheets.get(name, [])
+
+    def get_timezone(self):
+        return "UTC"
+
+
+def test_transliteration_matches_both_scripts():
+    assert transliterate("Иванов") == transliterate("Ivanov")
+    assert transliterate("Хабибуллин") == transliterate("Khabibullin")
+
+
+def test_fuzzy_ranks_closer_matches_first():
+    index = FuzzySurnameIndex(["иванов", "ivanova", "иванченко", "петров"])
+    assert index.fuzzy("Ivanof") == ["иванов", "ivanova"]
+    assert index.prefix("Иван") == ["иванов", "ivanova", "иванченко"]
+
+
+def test_search_modes(monkeypatch):
+    cache.clear()
+    sheets = {
+        "Trips": [
+            ["Trip ID", "Last Name", "First Name"],
+            ["T1", "Иванов", "Иван"],
+            ["T2", "Ivanova", "Anna"],
+            ["T3", "Petrov", "Petr"],
+        ]
+    }
+    monkeypatch.setattr("app.search.sheets_client", DummyClient(sheets))
+    assert search_by_surname("Ivanov")["count"] == 0
+    fuzzy = search_by_surname("Ivanov", mode="fuzzy")
+    assert [item["Trip_ID"] for item in fuzzy["results"]] == ["T1", "T2"]
+    prefix = search_by_surname("petr", mode="prefix")
+    assert [item["Trip_ID"] for item in prefix["results"]] == ["T3"]
+    with pytest.raises(InvalidQueryError):
+        search_by_surname("Ivanov", mode="sounds-like")
@@ -1,6 +1,6 @@
 import pytest
 
-from app.search import cache, get_trip
+from app.search import cache, get_trip, get_trip_batch
 
 
 class DummyClient:
@@ -49,3 +49,50 @@ def test_get_trip_missing(monkeypatch):
     monkeypatch.setattr("app.search.sheets_client", dummy)
     with pytest.raises(LookupError):
         get_trip("NONE")
+
+
+def test_get_trip_groups_contacts_by_client(monkeypatch):
+    cache.clear()
+    sheets = {
+        "Trips": [["Trip ID", "Destination"], ["T4", "Oslo"], ["T5", "Riga"]],
+        "Profile": [
+            ["Trip ID", "Client ID", "Last Name"],
+            ["T4", "C1", "Petrov"],
+            ["T5", "C9", "Other"],
+            ["T4", "C2", "Petrova"],
+        ],
+        "Contacts": [
+            ["Trip ID", "Client ID", "Phone"],
+            ["T4", "C2", "+2"],
+            ["T4", "", "+0"],
+            ["T5", "C9", "+9"],
+            ["T4", "C1", "+1"],
+        ],
+    }
+    dummy = DummyClient(sheets)
+    monkeypatch.setattr("app.search.sheets_client", dummy)
+    result = get_trip("T4")
+    phones = {
+        client["client_id"]: [contact["phone"] for contact in client["contacts"]]
+        for client in result["clients"]
+    }
+    assert phones == {"C1": ["+0", "+1"], "C2": ["+2", "+0"]}
+
+    cache.clear()
+    sheets["Trips"].append(["T6", "Baku"])
+    assert get_trip("T6")["trips"][0]["destination"] == "Baku"
+
+
+def test_get_trip_batch_reports_per_item(monkeypatch):
+    cache.clear()
+    sheets = {
+        "Trips": [["Trip ID", "Destination"], ["T7", "Oslo"], ["T8", "Riga"]],
+        "Profile": [["Trip ID"]],
+        "Contacts": [["Trip ID"]],
+    }
+    monkeypatch.setattr("app.search.sheets_client", DummyClient(sheets))
+    result = get_trip_batch(["T7", "NONE", "T8"])
+    assert result["count"] == 3
+    assert [item["status"] for item in result["items"]] == ["ok", "error", "ok"]
+    assert result["items"][2]["result"]["trips"][0]["destination"] == "Riga"
+    assert result["items"][1]["error"] == "trip not found"
@@ -0,0 +1,125 @@
+from app import search
+from app.search import cache, get_trip, refresh_sheets, search_by_surname
+
+
+class MutableClient:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def read_sheet(self, name):
+        return [list(row) for row in self.sheets.get(name, [])]
+
+    def read_sheets(self, names):
+        return {name: self.read_sheet(name) for name in names}
+
+    def get_timezone(self):
+        return "UTC"
+
+
+def _make_sheets(count):
+    return {
+        "Trips": [["Trip ID", "Last Name", "Notes"]]
+        + [[f"T{i}", f"Surname{i % 50}", ""] for i in range(count)],
+        "Profile": [["Trip ID", "Client ID"]] + [[f"T{i}", f"C{i}"] for i in range(count)],
+        "Contacts": [["Trip ID", "Client ID", "Phone"]]
+        + [[f"T{i}", f"C{i}", f"+{i}"] for i in range(count)],
+    }
+
+
+def _sheet(name):
+    return cache.get_stale(f"sheet:{name}")
+
+
+def _assert_indexes_match_full_rebuild():
+    trips, profile, contacts = (_sheet(name) for name in search.SHEET_NAMES)
+    fresh = search._build_trip_index(trips, profile, contacts)
+    index = cache.get_stale("index:trips")
+    assert index.trips == fresh.trips
+    assert index.profiles == fresh.profiles
+    assert index.contacts == fresh.contacts
+    assert trips.surname_index == search._build_surname_index(trips)
+
+
+def test_unchanged_refresh_keeps_snapshot(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr("app.search.sheets_client", MutableClient(_make_sheets(2000)))
+    refresh_sheets()
+    before = [_sheet(name) for name in search.SHEET_NAMES]
+    index = cache.get_stale("index:trips")
+
+    refresh_sheets()
+    assert [_sheet(name) for name in search.SHEET_NAMES] == before
+    assert all(a is b for a, b in zip(before, [_sheet(name) for name in search.SHEET_NAMES]))
+    assert cache.get_stale("index:trips") is index
+
+
+def test_changed_rows_are_patched(monkeypatch):
+    cache.clear()
+    sheets = _make_sheets(2000)
+    monkeypatch.setattr("app.search.sheets_client", MutableClient(sheets))
+    refresh_sheets()
+    trips_before = _sheet("Trips")
+
+    sheets["Trips"][1501][1] = "Renamed"
+    sheets["Trips"].append(["T9000", "Appended", ""])
+    sheets["Contacts"][11] = ["T700", "C700", "+moved"]
+    refresh_sheets()
+
+    trips_after = _sheet("Trips")
+    assert trips_after.patch is not None
+    assert trips_after.patch.base_version == trips_before.version
+    assert len(trips_after.patch.old_rows) < trips_after.row_count
+    assert _sheet("Profile").patch is None
+    _assert_indexes_match_full_rebuild()
+
+    assert search_by_surname("Renamed")["results"][0]["Trip_ID"] == "T1500"
+    assert search_by_surname("Appended")["count"] == 1
+    phones = [contact["phone"] for contact in get_trip("T700")["clients"][0]["contacts"]]
+    assert phones == ["+moved", "+700"]
+    assert get_trip("T10")["clients"][0]["contacts"] == []
+
+
+def test_header_change_triggers_full_rebuild(monkeypatch):
+    cache.clear()
+    sheets = _make_sheets(10)
+    monkeypatch.setattr("app.search.sheets_client", MutableClient(sheets))
+    refresh_sheets()
+    sheets["Trips"][0] = ["Trip ID", "Surname", "Last Name"]
+    refresh_sheets()
+    assert _sheet("Trips").patch is None
+    _assert_indexes_match_full_rebuild()
+
+
+def test_patched_rows_get_normalized_dates(monkeypatch):
+    cache.clear()
+    sheets = _make_sheets(2000)
+    sheets["Trips"][0].append("Start Date")
+    for row in sheets["Trips"][1:]:
+        row.append("01.02.2024")
+    monkeypatch.setattr("app.search.sheets_client", MutableClient(sheets))
+    refresh_sheets()
+
+    sheets["Trips"][1501][-1] = 45311
+    refresh_sheets()
+
+    assert _sheet("Trips").patch is not None
+    assert get_trip("T1500")["trips"][0]["start_date"] == "2024-01-20"
+    assert get_trip("T1499")["trips"][0]["start_date"] == "2024-02-01"
+
+
+def test_numeric_edits_with_colliding_hashes_are_detected(monkeypatch):
+    cache.clear()
+    sheets = _make_sheets(10)
+    sheets["Trips"][0].append("Total")
+    for row in sheets["Trips"][1:]:
+        row.append(-1)
+    monkeypatch.setattr("app.search.sheets_client", MutableClient(sheets))
+    refresh_sheets()
+
+    sheets["Trips"][4][-1] = -2
+    refresh_sheets()
+
+    trips = _sheet("Trips")
+    total_idx = trips.headers.index("Total")
+    assert trips.row_or_none(3)[total_idx] == -2
+    assert search._fingerprint([], [[1]]) != search._fingerprint([], [[True]])
@@ -0,0 +1,44 @@
+from app import metrics
+from app.search import cache, refresh_sheets, search_by_surname
+
+
+class DummyClient:
+    def read_sheets(self, names):
+        sheets = {
+            "Trips": [["Trip ID", "Last Name", "First Name"], ["T1", "Ivanov", "Ivan"]],
+            "Profile": [["Trip ID", "Client ID"]],
+            "Contacts": [["Trip ID", "Client ID", "Phone"]],
+        }
+        return {name: sheets[name] for name in names}
+
+    def get_timezone(self):
+        return "UTC"
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_latency_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="load")
+    histogram.observe(0.1, stage="load")
+    histogram.observe(3.0, stage="load")
+    assert histogram.samples() == [
+        'test_latency_seconds_bucket{stage="load",le="0.1"} 2.0',
+        'test_latency_seconds_bucket{stage="load",le="1.0"} 2.0',
+        'test_latency_seconds_bucket{stage="load",le="+Inf"} 3.0',
+        'test_latency_seconds_count{stage="load"} 3.0',
+        'test_latency_seconds_sum{stage="load"} 3.15',
+    ]
+
+
+def test_render_includes_cache_and_refresh_metrics(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr("app.search.sheets_client", DummyClient())
+    refresh_sheets()
+    search_by_surname("Ivanov")
+
+    text = metrics.render()
+    assert "# TYPE crm_sheet_lookups_total counter" in text
+    assert 'crm_sheet_lookups_total{result="fresh"}' in text
+    assert 'crm_cache_hit_ratio{cache="sheets"}' in text
+    assert "crm_sheets_last_refresh_age_seconds " in text
+    assert "# TYPE crm_singleflight_calls_total counter" in text
+    assert 'crm_singleflight_calls_total{result="executed"}' in text
@@ -0,0 +1,132 @@
+import dataclasses
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import search
+from app.pagination import CursorExpiredError, InvalidQueryError, decode_cursor, encode_cursor
+from app.search import cache, refresh_sheets, results_cache, search_by_surname
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class MutableClient:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def read_sheet(self, name):
+        return [list(row) for row in self.sheets.get(name, [])]
+
+    def read_sheets(self, names):
+        return {name: self.read_sheet(name) for name in names}
+
+    def get_timezone(self):
+        return "UTC"
+
+
+def _sheets(count):
+    return {
+        "Trips": [["Trip ID", "Last Name"]] + [[f"T{i}", "Ivanov" if i % 2 else "Ivanova"] for i in range(count)],
+        "Profile": [["Trip ID", "Client ID"]],
+        "Contacts": [["Trip ID", "Client ID"]],
+    }
+
+
+def _setup(monkeypatch, sheets, page_size=4):
+    cache.clear()
+    results_cache.clear()
+    monkeypatch.setattr("app.search.settings", dataclasses.replace(search.settings, max_search_results=page_size))
+    monkeypatch.setattr("app.search.sheets_client", MutableClient(sheets))
+    refresh_sheets()
+
+
+def test_cursor_roundtrip_and_validation():
+    cursor = encode_cursor(7, 20, "иванов", "exact")
+    assert decode_cursor(cursor, 7, "иванов", "exact") == 20
+    with pytest.raises(CursorExpiredError):
+        decode_cursor(cursor, 8, "иванов", "exact")
+    with pytest.raises(InvalidQueryError, match="does not match"):
+        decode_cursor(cursor, 7, "петров", "exact")
+    with pytest.raises(InvalidQueryError, match="invalid"):
+        decode_cursor("not-a-cursor", 7, "иванов", "exact")
+
+
+def test_pages_cover_all_matches(monkeypatch):
+    _setup(monkeypatch, _sheets(20))
+    seen = []
+    cursor = None
+    while True:
+        page = search_by_surname("Ivanov", cursor=cursor)
+        assert page["total"] == 10
+        seen.extend(item["Trip_ID"] for item in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"T{i}" for i in range(1, 20, 2)]
+
+    small = search_by_surname("Ivanov", limit=3)
+    assert small["count"] == 3
+    assert search_by_surname("Ivanov", limit=100)["count"] == 4
+
+
+def test_fuzzy_pages_are_stable(monkeypatch):
+    _setup(monkeypatch, _sheets(20))
+    first = search_by_surname("Ivan", "prefix")
+    second = search_by_surname("Ivan", "prefix", first["next_cursor"])
+    ids = [item["Trip_ID"] for item in first["results"] + second["results"]]
+    assert len(set(ids)) == 8
+    assert first["total"] == 20
+
+
+def test_cursor_expires_when_snapshot_changes(monkeypatch):
+    sheets = _sheets(20)
+    _setup(monkeypatch, sheets)
+    page = search_by_surname("Ivanov")
+
+    refresh_sheets()
+    assert search_by_surname("Ivanov", cursor=page["next_cursor"])["count"] == 4
+
+    sheets["Trips"][5][1] = "Petrov"
+    refresh_sheets()
+    with pytest.raises(CursorExpiredError):
+        search_by_surname("Ivanov", cursor=page["next_cursor"])
+
+
+_REPLAY = """
+import sys
+from app.pagination import CursorExpiredError
+from app.search import cache, search_by_surname
+from tests.test_pagination import MutableClient, _sheets
+import app.search
+
+cache.clear()
+app.search.sheets_client = MutableClient(_sheets(int(sys.argv[1])))
+cursor = sys.argv[2] if len(sys.argv) > 2 else None
+try:
+    page = search_by_surname("Ivanov", cursor=cursor)
+except CursorExpiredError:
+    print("expired")
+else:
+    print(page["next_cursor"] if cursor is None else "page")
+"""
+
+
+def _replay(*args):
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "MAX_SEARCH_RESULTS": "2"}
+    result = subprocess.run(
+        [sys.executable, "-c", _REPLAY, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def test_cursor_expires_in_another_process_with_other_data(monkeypatch):
+    cursor = _replay("12")
+    assert cursor and cursor != "None"
+    assert _replay("6", cursor) == "expired"
+
+    _setup(monkeypatch, _sheets(12))
+    with pytest.raises(CursorExpiredError):
+        search_by_surname("Ivanov", cursor=cursor)
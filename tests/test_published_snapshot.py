@@ -0,0 +1,54 @@
+import dataclasses
+
+import pytest
+
+from app import search
+from app.search import cache, refresh_sheets, search_by_surname
+
+
+class DummyClient:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def read_sheet(self, name):
+        return self.sheets.get(name, [])
+
+    def read_sheets(self, names):
+        return {name: self.sheets.get(name, []) for name in names}
+
+    def get_timezone(self):
+        return "UTC"
+
+
+class OfflineClient:
+    def __getattr__(self, name):
+        raise AssertionError("api worker must not call Google")
+
+
+def test_api_worker_reads_loader_snapshot(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.bin")
+    loader = dataclasses.replace(search.settings, snapshot_path=path, process_role="loader")
+    monkeypatch.setattr("app.search.settings", loader)
+    monkeypatch.setattr(
+        "app.search.sheets_client",
+        DummyClient({"Trips": [["Trip ID", "Last Name"], ["T1", "Ivanov"]]}),
+    )
+    cache.clear()
+    refresh_sheets()
+
+    worker = dataclasses.replace(search.settings, snapshot_path=path, process_role="api")
+    monkeypatch.setattr("app.search.settings", worker)
+    monkeypatch.setattr("app.search.sheets_client", OfflineClient())
+    cache.clear()
+    assert search_by_surname("Ivanov")["count"] == 1
+
+
+def test_api_worker_without_snapshot_fails(tmp_path, monkeypatch):
+    worker = dataclasses.replace(
+        search.settings, snapshot_path=str(tmp_path / "missing.bin"), process_role="api"
+    )
+    monkeypatch.setattr("app.search.settings", worker)
+    monkeypatch.setattr("app.search.sheets_client", OfflineClient())
+    cache.clear()
+    with pytest.raises(RuntimeError):
+        search_by_surname("Ivanov")
@@ -0,0 +1,101 @@
+from app.search import _approx_size, _load_sheet, cache, get_trip, refresh_sheets, results_cache, search_by_surname
+
+
+class CountingClient:
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.calls = {"read_sheet": 0, "read_sheets": 0, "get_timezone": 0}
+
+    def read_sheet(self, name):
+        self.calls["read_sheet"] += 1
+        return self.sheets.get(name, [])
+
+    def read_sheets(self, names):
+        self.calls["read_sheets"] += 1
+        return {name: self.sheets.get(name, []) for name in names}
+
+    def get_timezone(self):
+        self.calls["get_timezone"] += 1
+        return "UTC"
+
+
+def _sheets():
+    return {
+        "Trips": [
+            ["Trip ID", "Last Name", "First Name", "Destination", "Start Date"],
+            ["T1", "Ivanov", "Ivan", "Paris", "2024-01-20"],
+        ],
+        "Profile": [["Trip ID", "Client ID"], ["T1", "C1"]],
+        "Contacts": [["Trip ID", "Client ID", "Phone"], ["T1", "C1", "+1"]],
+    }
+
+
+def test_refresh_uses_one_batch_call(monkeypatch):
+    cache.clear()
+    client = CountingClient(_sheets())
+    monkeypatch.setattr("app.search.sheets_client", client)
+
+    refresh_sheets()
+    assert client.calls == {"read_sheet": 0, "read_sheets": 1, "get_timezone": 1}
+
+    assert search_by_surname("Ivanov")["count"] == 1
+    assert get_trip("T1")["clients"][0]["contacts"][0]["phone"] == "+1"
+    assert client.calls == {"read_sheet": 0, "read_sheets": 1, "get_timezone": 1}
+
+
+def test_cold_miss_reads_single_sheet(monkeypatch):
+    cache.clear()
+    client = CountingClient(_sheets())
+    monkeypatch.setattr("app.search.sheets_client", client)
+
+    search_by_surname("Ivanov")
+    assert client.calls == {"read_sheet": 1, "read_sheets": 0, "get_timezone": 0}
+
+
+def test_results_are_memoized_per_snapshot(monkeypatch):
+    cache.clear()
+    sheets = _sheets()
+    client = CountingClient(sheets)
+    monkeypatch.setattr("app.search.sheets_client", client)
+    refresh_sheets()
+
+    before = results_cache.stats()
+    first = get_trip("T1")
+    second = get_trip(" T1 ")
+    assert first["clients"] is second["clients"]
+    assert first["meta"] is not second["meta"]
+    assert second["meta"]["generated_at"]
+    search_by_surname("Ivanov")
+    search_by_surname("IVANOV")
+    after = results_cache.stats()
+    assert after["hits"] - before["hits"] == 2
+    assert after["misses"] - before["misses"] == 2
+
+    sheets["Trips"][1][3] = "Rome"
+    refresh_sheets()
+    assert get_trip("T1")["trips"][0]["destination"] == "Rome"
+
+
+def test_cold_sheet_load_counts_one_miss(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr("app.search.sheets_client", CountingClient(_sheets()))
+    before = cache.stats()
+    _load_sheet("Trips")
+    _load_sheet("Trips")
+    after = cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+    assert after["stale_hits"] == before["stale_hits"]
+
+
+def test_trip_index_is_charged_for_its_positions(monkeypatch):
+    cache.clear()
+    sheets = _sheets()
+    for i in range(2, 1000):
+        sheets["Trips"].append([f"T{i}", f"Surname{i}", "Ivan", "Paris", "2024-01-20"])
+        sheets["Profile"].append([f"T{i}", f"C{i}"])
+        sheets["Contacts"].append([f"T{i}", f"C{i}", f"+{i}"])
+    monkeypatch.setattr("app.search.sheets_client", CountingClient(sheets))
+    refresh_sheets()
+    index = cache.peek("index:trips")
+    assert _approx_size(index) > 100 * len(index.trips)
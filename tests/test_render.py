@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from app.render import (
+    chunk_messages,
+    more_callback_data,
+    parse_more_callback,
+    render_page_footer,
+    render_trip,
+    send_chunks,
+)
+
+
+class RetryAfter(Exception):
+    def __init__(self, retry_after):
+        super().__init__("flood control")
+        self.retry_after = retry_after
+
+
+class FakeBot:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.sent = []
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text) if reply_markup is None else (chat_id, text, reply_markup))
+
+
+def _search_messages(count):
+    return [
+        f"Номер заказа: T{i}\nФамилия: Иванов\nИмя: Иван\nНаправление: Paris\nДата вылета: 2024-01-20"
+        for i in range(count)
+    ]
+
+
+def test_results_are_packed_under_limit():
+    texts = _search_messages(200)
+    chunks = chunk_messages(texts)
+    assert len(chunks) < 10
+    assert all(len(chunk) <= 4096 for chunk in chunks)
+    assert "\n\n".join(chunks) == "\n\n".join(texts)
+
+
+def test_oversized_text_is_split():
+    text = "\n".join(f"строка {i}" for i in range(2000)) + "\n" + "x" * 5000
+    chunks = chunk_messages([text], limit=1000)
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == text.replace("\n", "")
+
+
+def test_render_trip_is_compact():
+    result = {
+        "meta": {"trip_id": "T1", "generated_at": "", "timezone": "UTC"},
+        "trips": [
+            {
+                "trip_id": "T1",
+                "main_tourist": {"last_name": "Иванов", "first_name": "Иван"},
+                "destination": "Paris",
+                "start_date": "2024-01-20",
+                "total": "1000",
+                "currency": "EUR",
+            }
+        ],
+        "clients": [
+            {
+                "client_id": "C1",
+                "last_name": "Иванов",
+                "first_name": "Иван",
+                "amount": "600",
+                "contacts": [{"phone": "+1", "email": "a@example.com"}],
+            },
+            {"client_id": "", "last_name": "", "first_name": "", "amount": "", "contacts": [{"phone": "", "email": ""}]},
+        ],
+    }
+    assert render_trip(result) == (
+        "Заказ T1 · Paris · 2024-01-20\n"
+        "Турист: Иванов Иван\n"
+        "Сумма: 1000 EUR\n"
+        "Клиенты (2):\n"
+        "1. Иванов Иван (C1) — 600\n"
+        "   +1, a@example.com\n"
+        "2. без имени"
+    )
+
+
+def test_send_chunks_backs_off_on_retry_after():
+    bot = FakeBot([RetryAfter(3)])
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    asyncio.run(send_chunks(bot, 42, ["one", "two"], sleep=fake_sleep))
+    assert bot.sent == [(42, "one"), (42, "two")]
+    assert sleeps == [3.0]
+
+
+def test_send_chunks_reraises_other_errors():
+    bot = FakeBot([RuntimeError("boom")])
+    with pytest.raises(RuntimeError):
+        asyncio.run(send_chunks(bot, 42, ["one"]))
+    assert bot.sent == []
+
+
+def test_send_chunks_attaches_markup_to_last_chunk():
+    bot = FakeBot()
+    asyncio.run(send_chunks(bot, 42, ["one", "two"], reply_markup="button"))
+    assert bot.sent == [(42, "one"), (42, "two", "button")]
+
+
+def test_more_callback_carries_the_whole_query():
+    data = more_callback_data("Иванов", "prefix", "AQAAAAAAAAAUAAAAAAAAAL46tP0")
+    assert len(data.encode("utf-8")) <= 64
+    assert parse_more_callback(data) == ("Иванов", "prefix", "AQAAAAAAAAAUAAAAAAAAAL46tP0")
+    assert more_callback_data("Константинопольский-Иванов", "exact", "AQAAAAAAAAAUAAAAAAAAAL46tP0") is None
+    with pytest.raises(ValueError):
+        parse_more_callback("more:broken")
+
+
+def test_page_footer_counts_previous_pages():
+    assert render_page_footer({"offset": 20, "count": 20, "total": 45}, has_button=True) == "Показано 40 из 45."
+    assert render_page_footer({"offset": 0, "count": 20, "total": 45}, has_button=False).endswith(
+        "Уточните запрос, чтобы увидеть остальные."
+    )
@@ -0,0 +1,45 @@
+import logging
+
+from app.schema import compile_schema
+from app.search import cache, get_trip, search_by_surname
+from app.sheets_client import get_header_map
+
+
+class DummyClient:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def read_sheet(self, name):
+        return self.sheets.get(name, [])
+
+    def get_timezone(self):
+        return "UTC"
+
+
+def test_schema_resolves_header_variants():
+    _, _, header_map = get_header_map([[" TRIP_ID ", "LastName", "first  name", "Notes", "Amount"]])
+    schema = compile_schema("Trips", header_map)
+    assert schema.columns == {"trip_id": 0, "last_name": 1, "first_name": 2, "total": 4}
+    assert schema.missing_required == ()
+    assert schema.missing_optional == ("start_date", "destination", "currency")
+    assert schema.remap({0: 0, 1: 1, 2: 2, 4: 3}).index("total") == 3
+
+
+def test_missing_required_column_is_logged_at_load(monkeypatch, caplog):
+    cache.clear()
+    sheets = {
+        "Trips": [["Trip ID", "Last Name"], ["T1", "Ivanov"]],
+        "Profile": [["Trip ID", "Name"], ["T1", "Ivan"]],
+        "Contacts": [["Trip ID", "Phone"], ["T1", "+1"]],
+    }
+    monkeypatch.setattr("app.search.sheets_client", DummyClient(sheets))
+    with caplog.at_level(logging.WARNING, logger="search"):
+        trip = get_trip("T1")
+        search_by_surname("Ivanov")
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert "sheet=Profile status=schema_invalid missing=client_id" in messages
+    assert "sheet=Contacts status=schema_incomplete missing=client_id,email" in messages
+    assert sum("sheet=Trips" in message for message in messages) == 1
+    assert trip["clients"][0]["client_id"] == ""
+    assert trip["clients"][0]["contacts"] == [{"phone": "+1", "email": ""}]
@@ -1,4 +1,4 @@
-from app.search import cache, search_by_surname
+from app.search import cache, search_batch, search_by_surname
 
 
 class DummyClient:
@@ -42,3 +42,62 @@ def test_search_no_results(monkeypatch):
     result = search_by_surname("Petrov")
     assert result["count"] == 0
     assert result["results"] == []
+
+
+def test_search_uses_surname_index(monkeypatch):
+    cache.clear()
+    sheets = {
+        "Trips": [
+            ["Trip ID", "Last Name", "First Name"],
+            ["T1", "Ivanov", "Ivan"],
+            ["T2", "Petrov", "Petr"],
+            ["T3", " IVANOV ", "Anna"],
+        ]
+    }
+    dummy = DummyClient(sheets)
+    monkeypatch.setattr("app.search.sheets_client", dummy)
+    result = search_by_surname("ivanov")
+    assert [item["Trip_ID"] for item in result["results"]] == ["T1", "T3"]
+
+
+def test_search_batch(monkeypatch):
+    cache.clear()
+    sheets = {
+        "Trips": [
+            ["Trip ID", "Last Name", "First Name"],
+            ["T1", "Ivanov", "Ivan"],
+            ["T2", "Petrov", "Petr"],
+        ]
+    }
+    monkeypatch.setattr("app.search.sheets_client", DummyClient(sheets))
+    result = search_batch(["Petrov", "", "Sidorov"])
+    assert [item["status"] for item in result["items"]] == ["ok", "error", "ok"]
+    assert result["items"][0]["result"]["results"][0]["Trip_ID"] == "T2"
+    assert result["items"][2]["result"]["count"] == 0
+
+
+def test_search_dates_are_normalized_at_load(monkeypatch):
+    cache.clear()
+    sheets = {
+        "Trips": [
+            ["Trip ID", "Last Name", "Start Date"],
+            ["T1", "Ivanov", 45311],
+            ["T2", "Ivanov", 45311.75],
+            ["T3", "Ivanov", " 20.01.2024 "],
+            ["T4", "Ivanov", "20/01/2024"],
+            ["T5", "Ivanov", "уточняется"],
+            ["T6", "Ivanov", ""],
+        ]
+    }
+    monkeypatch.setattr("app.search.sheets_client", DummyClient(sheets))
+    result = search_by_surname("Ivanov")
+    assert [item["startDate"] for item in result["results"]] == [
+        "2024-01-20",
+        "2024-01-20",
+        "2024-01-20",
+        "2024-01-20",
+        "уточняется",
+        "",
+    ]
+    assert "Дата вылета: не указана" in result["textMessages"][5]
+    assert cache.get("sheet:Trips").columns[2][0] == "2024-01-20"
@@ -0,0 +1,35 @@
+import pytest
+
+from app.security import MemoryRateLimitBackend, RateLimitBackend, RateLimiter, SharedMemoryRateLimitBackend
+
+
+def test_rate_limiter_charges_cost():
+    limiter = RateLimiter(rate_per_min=10)
+    assert limiter.allow("api:key", cost=6)
+    assert not limiter.allow("api:key", cost=6)
+    assert limiter.allow("api:key", cost=4)
+
+
+def test_memory_backend_evicts_idle_and_caps_keys():
+    backend = MemoryRateLimitBackend(max_keys=3, idle_seconds=60)
+    for index in range(5):
+        backend.take(f"key{index}", 1, 10, 1, now=1000)
+    assert backend.size() == 3
+    backend.take("fresh", 1, 10, 1, now=1100)
+    assert backend.size() == 1
+
+
+def test_shared_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "ratelimit.bin")
+    first = RateLimiter(2, SharedMemoryRateLimitBackend(path, slots=64, idle_seconds=60))
+    second = RateLimiter(2, SharedMemoryRateLimitBackend(path, slots=64, idle_seconds=60))
+    assert first.allow("api:key")
+    assert second.allow("api:key")
+    assert not first.allow("api:key")
+    assert second.allow("api:other")
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+    assert isinstance(RateLimiter(5).backend, MemoryRateLimitBackend)
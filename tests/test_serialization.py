@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from app import serialization
+from app.pagination import InvalidQueryError
+from app.search import cache, iter_get_trip_batch, iter_search_batch
+
+
+class DummyClient:
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.reads = 0
+
+    def read_sheet(self, name):
+        self.reads += 1
+        return self.sheets.get(name, [])
+
+    def get_timezone(self):
+        return "UTC"
+
+
+PAYLOAD = {"status": "ok", "items": [{"key": "Иванов", "count": 2, "total": 1.5, "ok": True, "none": None}]}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_matches_stdlib(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    body = serialization.dumps(PAYLOAD)
+    assert json.loads(body) == PAYLOAD
+    assert "Иванов".encode("utf-8") in body
+
+
+def test_ndjson_chunks_are_bounded():
+    items = iter([{"n": index} for index in range(5)])
+    assert serialization.ndjson_chunk(items, 2) == b'{"n":0}\n{"n":1}\n'
+    assert serialization.ndjson_chunk(items, 2) == b'{"n":2}\n{"n":3}\n'
+    assert serialization.ndjson_chunk(items, 2) == b'{"n":4}\n'
+    assert serialization.ndjson_chunk(items, 2) == b""
+
+
+def test_batch_iterators_load_eagerly_and_build_lazily(monkeypatch):
+    cache.clear()
+    client = DummyClient(
+        {
+            "Trips": [["Trip ID", "Last Name"], ["T1", "Ivanov"]],
+            "Profile": [["Trip ID", "Client ID"], ["T1", "C1"]],
+            "Contacts": [["Trip ID", "Client ID", "Phone"]],
+        }
+    )
+    monkeypatch.setattr("app.search.sheets_client", client)
+
+    with pytest.raises(InvalidQueryError):
+        iter_search_batch(["Ivanov"], "nope")
+    items = iter_search_batch(["Ivanov", " "], "exact")
+    assert client.reads == 1
+    assert [item["status"] for item in items] == ["ok", "error"]
+
+    trips = iter_get_trip_batch(["T1", "T404"])
+    assert next(trips)["result"]["clients"][0]["client_id"] == "C1"
+    assert next(trips) == {"key": "T404", "status": "error", "error": "trip not found"}
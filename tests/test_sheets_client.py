@@ -0,0 +1,89 @@
+import dataclasses
+
+from app import sheets_client as module
+from app.sheets_client import SheetsClient, _column_letter
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakeService:
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.calls = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def batchGet(self, spreadsheetId, ranges, valueRenderOption):
+        self.calls.append((list(ranges), valueRenderOption))
+        return FakeRequest({"valueRanges": [{"values": self._read(a1)} for a1 in ranges]})
+
+    def _read(self, a1):
+        name, cells = a1.rsplit("!", 1)
+        rows = self.sheets[name.strip("'")]
+        if cells == "1:1":
+            return rows[:1]
+        start, end = cells.split(":")
+        first_row = int("".join(ch for ch in start if ch.isdigit()) or 1)
+        last_row = int("".join(ch for ch in end if ch.isdigit()))
+        selected = rows[first_row - 1 : last_row]
+        start_col = "".join(ch for ch in start if ch.isalpha())
+        end_col = "".join(ch for ch in end if ch.isalpha())
+        if not start_col:
+            return selected
+        lo = [_column_letter(i) for i in range(60)].index(start_col)
+        hi = [_column_letter(i) for i in range(60)].index(end_col)
+        # The API trims trailing empty cells of each row.
+        result = []
+        for row in selected:
+            cells = row[lo : hi + 1]
+            while cells and cells[-1] == "":
+                cells = cells[:-1]
+            result.append(cells)
+        return result
+
+
+def _client(sheets):
+    client = SheetsClient("sheet-id", "{}")
+    client._service = FakeService(sheets)
+    return client
+
+
+def test_column_letters():
+    assert [_column_letter(i) for i in (0, 25, 26, 51, 701, 702)] == ["A", "Z", "AA", "AZ", "ZZ", "AAA"]
+
+
+def test_reads_only_needed_columns_and_rows(monkeypatch):
+    monkeypatch.setattr(module, "settings", dataclasses.replace(module.settings, max_sheet_rows=2))
+    sheets = {
+        "Trips": [
+            ["Trip ID", "Notes", "Last Name", "First Name", "Manager", "Start Date", ""],
+            ["T1", "x", "Ivanov", "", "m", 45311],
+            ["T2", "y", "Petrov", "Petr", "m", ""],
+            ["T3", "z", "Sidorov", "Sid", "m", 45312],
+        ],
+        "Other": [["A", "B"], [1, 2]],
+    }
+    client = _client(sheets)
+
+    result = client.read_sheets(["Trips", "Other"])
+
+    headers_call, data_call = client._service.calls
+    assert headers_call == (["'Trips'!1:1", "'Other'!1:1"], "UNFORMATTED_VALUE")
+    assert data_call == (["'Trips'!A1:A3", "'Trips'!C1:D3", "'Trips'!F1:F3", "'Other'!1:3"], "UNFORMATTED_VALUE")
+    assert result["Trips"] == [
+        ["Trip ID", "Last Name", "First Name", "Start Date"],
+        ["T1", "Ivanov", "", 45311],
+        ["T2", "Petrov", "Petr", ""],
+    ]
+    assert result["Other"] == [["A", "B"], [1, 2]]
+    assert client.read_sheet("Trips") == result["Trips"]
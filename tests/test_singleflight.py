@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return "data"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("sheet:Trips", load)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while flights.stats()["coalesced"] < 9 and time.time() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["data"] * 10
+    assert flights.stats() == {"executed": 1, "coalesced": 9, "in_flight": 0}
+
+
+def test_error_is_shared_and_not_cached():
+    flights = SingleFlight()
+
+    def fail():
+        raise RuntimeError("quota")
+
+    with pytest.raises(RuntimeError):
+        flights.do("sheet:Trips", fail)
+    assert flights.do("sheet:Trips", lambda: "ok") == "ok"
@@ -0,0 +1,89 @@
+import dataclasses
+import time
+
+import pytest
+
+from app import search
+from app.search import cache, get_trip, refresh_sheets, restore_snapshot, search_by_surname
+from app.snapshot import load_snapshot, save_snapshot
+
+
+class DummyClient:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def read_sheet(self, name):
+        return self.sheets.get(name, [])
+
+    def read_sheets(self, names):
+        return {name: self.sheets.get(name, []) for name in names}
+
+    def get_timezone(self):
+        return "UTC"
+
+
+class OfflineClient:
+    def __getattr__(self, name):
+        raise AssertionError("network call after snapshot restore")
+
+
+def test_snapshot_rejects_other_schema_and_old_files(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.bin")
+    save_snapshot(path, 7, {"value": 1})
+    assert load_snapshot(path, 7, max_age=60) == {"value": 1}
+    assert load_snapshot(path, 8, max_age=60) is None
+    monkeypatch.setattr("app.snapshot.time.time", lambda: 10**12)
+    assert load_snapshot(path, 7, max_age=60) is None
+    assert load_snapshot(str(tmp_path / "missing.bin"), 7, max_age=60) is None
+
+
+def test_restore_serves_requests_without_network(tmp_path, monkeypatch):
+    patched = dataclasses.replace(search.settings, snapshot_path=str(tmp_path / "snapshot.bin"))
+    monkeypatch.setattr("app.search.settings", patched)
+    cache.clear()
+    sheets = {
+        "Trips": [["Trip ID", "Last Name"], ["T1", "Ivanov"]],
+        "Profile": [["Trip ID", "Client ID"], ["T1", "C1"]],
+        "Contacts": [["Trip ID", "Client ID", "Email"], ["T1", "C1", "a@b.c"]],
+    }
+    monkeypatch.setattr("app.search.sheets_client", DummyClient(sheets))
+    refresh_sheets()
+
+    cache.clear()
+    monkeypatch.setattr("app.search.sheets_client", OfflineClient())
+    assert restore_snapshot()
+    assert search_by_surname("Ivanov")["count"] == 1
+    assert get_trip("T1")["clients"][0]["contacts"][0]["email"] == "a@b.c"
+
+
+def _publish_aged_snapshot(tmp_path, monkeypatch, age):
+    patched = dataclasses.replace(search.settings, snapshot_path=str(tmp_path / "snapshot.bin"), process_role="api")
+    monkeypatch.setattr("app.search.settings", patched)
+    cache.clear()
+    sheets = {
+        "Trips": [["Trip ID", "Last Name"], ["T1", "Ivanov"]],
+        "Profile": [["Trip ID", "Client ID"], ["T1", "C1"]],
+        "Contacts": [["Trip ID", "Client ID", "Email"], ["T1", "C1", "a@b.c"]],
+    }
+    monkeypatch.setattr("app.search.sheets_client", DummyClient(sheets))
+    refresh_sheets()
+    payload = load_snapshot(patched.snapshot_path, search._SNAPSHOT_SCHEMA, max_age=60)
+    payload["refreshed_at"] = time.time() - age
+    save_snapshot(patched.snapshot_path, search._SNAPSHOT_SCHEMA, payload)
+    cache.clear()
+    monkeypatch.setattr("app.search.sheets_client", OfflineClient())
+
+
+def test_worker_ages_restored_entries_by_the_loader_refresh(tmp_path, monkeypatch):
+    _publish_aged_snapshot(tmp_path, monkeypatch, search.settings.cache_ttl + 60)
+    assert restore_snapshot()
+    assert cache.lookup("sheet:Trips")[1] == "stale"
+    assert search_by_surname("Ivanov")["count"] == 1
+
+
+def test_worker_refuses_snapshot_past_staleness_limit(tmp_path, monkeypatch):
+    limit = search.settings.cache_ttl + search.settings.cache_max_staleness
+    _publish_aged_snapshot(tmp_path, monkeypatch, limit + 60)
+    assert not restore_snapshot()
+    with pytest.raises(RuntimeError):
+        search_by_surname("Ivanov")
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _imported_modules(token):
+    code = "import sys, app.main; print(','.join(sorted(m for m in ('aiogram', 'app.bot', 'app.webhook') if m in sys.modules)))"
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "TELEGRAM_BOT_TOKEN": token, "BOT_MODE": "webhook"}
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_bot_stack_is_not_imported_without_token():
+    assert _imported_modules("") == ""
+
+
+def test_webhook_router_is_imported_with_token():
+    pytest.importorskip("aiogram")
+    assert _imported_modules("42:TEST") == "aiogram,app.webhook"
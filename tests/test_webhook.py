@@ -0,0 +1,66 @@
+import dataclasses
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("aiogram")
+pytest.importorskip("httpx")
+
+from aiogram import Bot
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import webhook
+from app.webhook import SECRET_HEADER, WEBHOOK_PATH, TelegramWebhook
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 10,
+        "date": 1700000000,
+        "chat": {"id": 42, "type": "private"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Ivan"},
+        "text": "/search Ivanov",
+    },
+}
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.updates = []
+
+    async def feed_update(self, bot, update):
+        self.updates.append(update)
+
+
+def _app(monkeypatch):
+    monkeypatch.setattr(
+        "app.webhook.settings", dataclasses.replace(webhook.settings, telegram_webhook_secret="s3cret")
+    )
+    app = FastAPI()
+    app.include_router(webhook.router)
+    dispatcher = FakeDispatcher()
+    app.state.telegram_webhook = TelegramWebhook(bot=Bot(token="42:TEST"), dispatcher=dispatcher)
+    return app, dispatcher
+
+
+def test_webhook_feeds_update_to_dispatcher(monkeypatch):
+    app, dispatcher = _app(monkeypatch)
+    with TestClient(app) as client:
+        response = client.post(WEBHOOK_PATH, json=UPDATE, headers={SECRET_HEADER: "s3cret"})
+        deadline = time.monotonic() + 5
+        while not dispatcher.updates and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+    assert [update.message.text for update in dispatcher.updates] == ["/search Ivanov"]
+
+
+def test_webhook_rejects_wrong_secret(monkeypatch):
+    app, dispatcher = _app(monkeypatch)
+    with TestClient(app) as client:
+        assert client.post(WEBHOOK_PATH, json=UPDATE, headers={SECRET_HEADER: "nope"}).status_code == 403
+        assert client.post(WEBHOOK_PATH, json=UPDATE).status_code == 403
+        assert client.post(WEBHOOK_PATH, json={"bad": 1}, headers={SECRET_HEADER: "s3cret"}).status_code == 400
+    assert dispatcher.updates == []